@@ -10,7 +10,7 @@ BEGIN
     CREATE TABLE app.users (
         user_id        INT IDENTITY(1,1) PRIMARY KEY,
         name           NVARCHAR(255)       NULL,
-        email          NVARCHAR(255)       NOT NULL,
+        email          NVARCHAR(255)       NOT NULL, -- klein geschrieben gespeichert, Suche per email=... über UQ_users_email
         creation_date  DATETIME2           NOT NULL CONSTRAINT DF_users_creation_date DEFAULT SYSUTCDATETIME(),
         CONSTRAINT UQ_users_email UNIQUE (email)
     );
@@ -79,6 +79,7 @@ BEGIN
         name           NVARCHAR(100)       NOT NULL,
         [type]         NVARCHAR(20)        NOT NULL, -- 'expense' | 'income'
         created_at     DATETIME2           NOT NULL CONSTRAINT DF_categories_created_at DEFAULT SYSUTCDATETIME(),
+        name_lower     AS LOWER(name) PERSISTED, -- für indexierte Suche ohne Gross-/Kleinschreibung
         CONSTRAINT CK_categories_type
             CHECK ([type] IN (N'expense', N'income')),
         CONSTRAINT UQ_categories_name UNIQUE (name, [type])
@@ -87,6 +88,18 @@ BEGIN
 END
 GO
 
+-- Bestehende Datenbanken: berechnete Spalte nachziehen
+IF COL_LENGTH('app.categories', 'name_lower') IS NULL
+    ALTER TABLE app.categories ADD name_lower AS LOWER(name) PERSISTED;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_categories_name_lower' AND object_id = OBJECT_ID('app.categories')
+)
+    CREATE INDEX IX_categories_name_lower ON app.categories(name_lower) INCLUDE (category_id);
+GO
+
 -- TRANSACTIONS
 
 IF OBJECT_ID('app.transactions') IS NULL
@@ -110,8 +123,10 @@ BEGIN
         -- WICHTIG: KEINE Cascade-Action hier, um multiple Pfade zu vermeiden
         CONSTRAINT FK_transactions_category
             FOREIGN KEY (category_id) REFERENCES app.categories(category_id),
+        -- Beim Löschen eines Belegs bleibt die Transaktion erhalten, nur der Verweis fällt weg
         CONSTRAINT FK_transactions_receipt
-            FOREIGN KEY (receipt_id) REFERENCES app.receipts(receipt_id),
+            FOREIGN KEY (receipt_id) REFERENCES app.receipts(receipt_id)
+            ON DELETE SET NULL,
 
         CONSTRAINT CK_transactions_type
             CHECK ([type] IN (N'expense', N'income')),
@@ -124,6 +139,21 @@ BEGIN
 END
 GO
 
+-- Bestehende Datenbanken: FK_transactions_receipt auf ON DELETE SET NULL umstellen
+IF EXISTS (
+    SELECT 1 FROM sys.foreign_keys
+    WHERE name = 'FK_transactions_receipt'
+      AND parent_object_id = OBJECT_ID('app.transactions')
+      AND delete_referential_action_desc <> 'SET_NULL'
+)
+BEGIN
+    ALTER TABLE app.transactions DROP CONSTRAINT FK_transactions_receipt;
+    ALTER TABLE app.transactions ADD CONSTRAINT FK_transactions_receipt
+        FOREIGN KEY (receipt_id) REFERENCES app.receipts(receipt_id)
+        ON DELETE SET NULL;
+END
+GO
+
 
 -- BUDGETS
 
@@ -199,6 +229,17 @@ BEGIN
 END
 GO
 
+-- Belegübersicht pro Benutzer: liefert die Zeilen bereits in der Sortierung von
+-- list_receipts_overview(), ohne Sortierschritt und ohne Lookup für die Übersichtsspalten.
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_receipts_user_upload' AND object_id = OBJECT_ID('app.receipts')
+)
+    CREATE INDEX IX_receipts_user_upload
+        ON app.receipts(user_id, upload_date DESC, receipt_id DESC)
+        INCLUDE (status_id, issuer_name, issuer_city, issuer_country);
+GO
+
 -- Status-Tabelle für Rechnungen
 
 IF OBJECT_ID('app.receipt_status') IS NULL
@@ -7,11 +7,21 @@ Azure SQL-Datenbank benötigt werden. Es kümmert sich um das Herstellen
 von Verbindungen, das Ausführen von SQL-Abfragen und das Zurückgeben der Ergebnisse.
 """
 
+import asyncio
+import atexit
+import functools
 import os
 import hashlib
+import hmac
 import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Iterator
 from dotenv import load_dotenv
 import pymssql
 
@@ -43,23 +53,485 @@ CONNECT_KW = dict(
     tds_version="7.4",  # Wichtig für die Kompatibilität mit Azure SQL
 )
 
+# --- Connection-Pool ---
+# Ein Verbindungsaufbau zu Azure SQL (TCP + TLS + Login) dauert oft mehrere hundert
+# Millisekunden. Deshalb halten wir offene Verbindungen in einem kleinen Pool vor und
+# verwenden sie für die nächsten Aufrufe wieder.
+POOL_MIN = int(os.getenv("DB_POOL_MIN", "5"))  # Verbindungen, die dauerhaft offen bleiben
+POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))  # Obergrenze gleichzeitig offener Verbindungen
+POOL_MAX_IDLE_SECONDS = 300.0  # Überzählige Verbindungen danach schließen
+POOL_PING_AFTER_SECONDS = 60.0  # Länger ungenutzte Verbindungen vor Ausgabe prüfen
+# Maximale Wartezeit auf eine freie Verbindung, bevor ein Aufruf mit Fehler abbricht
+POOL_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+
+class _ConnectionPool:
+    """
+    Threadsicherer Pool für wiederverwendbare pymssql-Verbindungen.
+
+    Verbindungen werden erst bei Bedarf geöffnet (lazy) und nach Gebrauch wieder
+    abgelegt. Tritt während der Nutzung ein `pymssql.Error` auf, wird die Verbindung
+    verworfen, damit keine defekten Verbindungen im Pool landen.
+    """
+
+    def __init__(
+        self,
+        connect_kw: dict,
+        *,
+        min_size: int,
+        max_size: int,
+        slots: threading.BoundedSemaphore | None = None,
+        acquire_timeout: float = POOL_ACQUIRE_TIMEOUT_SECONDS,
+    ) -> None:
+        self._connect_kw = dict(connect_kw)
+        self._max_size = max(1, max_size)
+        self._min_size = max(0, min(min_size, self._max_size))
+        # Mehrere Pools können sich eine gemeinsame Obergrenze (Semaphore) teilen.
+        self._slots = slots or threading.BoundedSemaphore(self._max_size)
+        self._acquire_timeout = acquire_timeout
+        self._lock = threading.Lock()
+        # Zuletzt benutzte Verbindungen liegen rechts (LIFO), alte sammeln sich links.
+        self._idle: deque[tuple[pymssql.Connection, float]] = deque()
+
+    def _connect(self) -> pymssql.Connection:
+        """Baut eine neue Verbindung mit den hinterlegten Parametern auf."""
+        return pymssql.connect(**self._connect_kw)
+
+    @staticmethod
+    def _close_quietly(conn: pymssql.Connection) -> None:
+        """Schließt eine Verbindung und ignoriert dabei auftretende Fehler."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(conn: pymssql.Connection) -> bool:
+        """Prüft mit einem leichten `SELECT 1`, ob die Verbindung noch nutzbar ist."""
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            return True
+        except Exception:
+            return False
+
+    def _checkout(self) -> pymssql.Connection:
+        """Liefert eine geprüfte Verbindung aus dem Pool oder öffnet eine neue."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, last_used = self._idle.pop()
+            if time.monotonic() - last_used < POOL_PING_AFTER_SECONDS or self._is_alive(conn):
+                return conn
+            self._close_quietly(conn)
+        return self._connect()
+
+    def _checkin(self, conn: pymssql.Connection) -> None:
+        """Legt eine Verbindung zurück und räumt lange ungenutzte Überzähler auf."""
+        now = time.monotonic()
+        expired: list[pymssql.Connection] = []
+        with self._lock:
+            self._idle.append((conn, now))
+            while (
+                len(self._idle) > self._min_size
+                and now - self._idle[0][1] > POOL_MAX_IDLE_SECONDS
+            ):
+                expired.append(self._idle.popleft()[0])
+        for stale in expired:
+            self._close_quietly(stale)
+
+    @contextmanager
+    def acquire(self) -> Iterator[pymssql.Connection]:
+        """
+        Leiht eine Verbindung für die Dauer eines `with`-Blocks aus.
+
+        Bei Datenbankfehlern wird die Verbindung geschlossen, bei anderen Ausnahmen
+        werden offene Änderungen zurückgerollt, bevor sie in den Pool zurückkehrt.
+
+        Raises:
+            RuntimeError: Wenn innerhalb von `acquire_timeout` Sekunden keine
+                Verbindung frei wird.
+        """
+        if not self._slots.acquire(timeout=self._acquire_timeout):
+            raise RuntimeError(
+                f"Keine freie Datenbankverbindung nach {self._acquire_timeout:g} s "
+                "(Pool ausgelastet)."
+            )
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+            except pymssql.Error:
+                self._close_quietly(conn)
+                raise
+            except BaseException:
+                try:
+                    conn.rollback()
+                except Exception:
+                    self._close_quietly(conn)
+                else:
+                    self._checkin(conn)
+                raise
+            else:
+                self._checkin(conn)
+        finally:
+            self._slots.release()
+
+    def close_all(self) -> None:
+        """Schließt alle aktuell ungenutzten Verbindungen (z.B. beim Herunterfahren)."""
+        with self._lock:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._close_quietly(conn)
+
+
+# Reine Lesezugriffe laufen über Verbindungen mit Autocommit. pymssql startet sonst
+# bei jeder Verbindung ein "BEGIN TRAN", das bei SELECTs nie committet wird und
+# unnötig Sperren sowie einen zusätzlichen Round-Trip kostet. Schreibzugriffe aus
+# genau einem Statement nutzen denselben Pool (`_get_connection(autocommit=True)`).
+READ_CONNECT_KW = {**CONNECT_KW, "autocommit": True}
+
+_pool_slots = threading.BoundedSemaphore(max(1, POOL_MAX))
+_pool = _ConnectionPool(
+    CONNECT_KW, min_size=POOL_MIN, max_size=POOL_MAX, slots=_pool_slots
+)
+_read_pool = _ConnectionPool(
+    READ_CONNECT_KW, min_size=POOL_MIN, max_size=POOL_MAX, slots=_pool_slots
+)
+
+
+def close_connection_pools() -> None:
+    """Schließt alle offenen Pool-Verbindungen; wird beim Beenden automatisch aufgerufen."""
+    _pool.close_all()
+    _read_pool.close_all()
+
+
+atexit.register(close_connection_pools)
+
+
+def _get_connection(*, readonly: bool = False, autocommit: bool = False):
+    """
+    Leiht eine Verbindung aus dem passenden Pool aus.
+
+    Args:
+        readonly: True für reine SELECT-Abfragen (Autocommit, keine Transaktion).
+        autocommit: True für Schreibzugriffe aus genau einem Statement. Das Statement
+            ist für sich atomar, ein explizites `commit()` entfällt.
+    """
+    return (_read_pool if readonly or autocommit else _pool).acquire()
+
+
+# Gültigkeitsdauer für zwischengespeicherte Lookups (Kategorie-IDs, Hauptkonten)
+LOOKUP_CACHE_TTL_SECONDS = float(os.getenv("DB_LOOKUP_CACHE_TTL", "300"))
+LOOKUP_CACHE_MAX_ENTRIES = 4096
+
+
+class _TTLCache:
+    """
+    Kleiner threadsicherer Cache, dessen Einträge nach `ttl` Sekunden verfallen.
+
+    Gedacht für selten ändernde Lookups, die sonst bei jeder Belegverarbeitung
+    einen eigenen Round-Trip zur Datenbank kosten würden.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, *, ttl: float, max_entries: int) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Liefert den gespeicherten Wert oder `_TTLCache._MISSING`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return self._MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return self._MISSING
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self._max_entries:
+                # Ältesten Eintrag verwerfen (dict behält die Einfügereihenfolge).
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+
+    def invalidate(self, key=_MISSING) -> None:
+        """Entfernt einen einzelnen Eintrag oder (ohne Argument) alle Einträge."""
+        with self._lock:
+            if key is self._MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+_category_id_cache = _TTLCache(
+    ttl=LOOKUP_CACHE_TTL_SECONDS, max_entries=LOOKUP_CACHE_MAX_ENTRIES
+)
+_primary_account_cache = _TTLCache(
+    ttl=LOOKUP_CACHE_TTL_SECONDS, max_entries=LOOKUP_CACHE_MAX_ENTRIES
+)
+_category_list_cache = _TTLCache(ttl=LOOKUP_CACHE_TTL_SECONDS, max_entries=1)
+# Detailzeilen geöffneter Belege: ein erneutes Öffnen derselben Karte braucht so keinen
+# Round-Trip. Alle Schreibfunktionen für Belege/Transaktionen verwerfen den Eintrag.
+RECEIPT_DETAIL_CACHE_TTL_SECONDS = 60.0
+_receipt_detail_cache = _TTLCache(ttl=RECEIPT_DETAIL_CACHE_TTL_SECONDS, max_entries=256)
+
+
+def invalidate_categories() -> None:
+    """Leert die Kategorie-Caches; nach jeder Änderung an app.categories aufrufen."""
+    _category_id_cache.invalidate()
+    _category_list_cache.invalidate()
+    # Belegdetails enthalten Kategoriename und -typ.
+    _receipt_detail_cache.invalidate()
+
+
+def invalidate_primary_account(user_id: int | None = None) -> None:
+    """Verwirft das zwischengespeicherte Hauptkonto eines Benutzers (oder aller Benutzer)."""
+    if user_id is None:
+        _primary_account_cache.invalidate()
+    else:
+        _primary_account_cache.invalidate(user_id)
+
+
+# Speicherbudget für zwischengespeicherte Belegbilder (in MB, 0 schaltet den Cache ab)
+RECEIPT_IMAGE_CACHE_BYTES = int(float(os.getenv("DB_IMAGE_CACHE_MB", "64")) * 1024 * 1024)
+
+
+class _ReceiptImageCache:
+    """
+    Threadsicherer LRU-Cache für Belegbilder, begrenzt durch die Summe der Bytes.
+
+    Belegbilder ändern sich nach dem Upload nicht mehr; häufig angezeigte Bilder
+    müssen so nicht bei jedem Aufruf erneut als VARBINARY(MAX) gelesen werden.
+    Einzelne Bilder über einem Achtel des Budgets werden nicht aufgenommen.
+    Abgelegt wird immer unveränderliches `bytes`, da Treffer ohne Kopie an
+    mehrere Aufrufer gleichzeitig gehen.
+    """
+
+    def __init__(self, *, max_bytes: int) -> None:
+        self._max_bytes = max(0, max_bytes)
+        self._total_bytes = 0
+        self._entries: OrderedDict[int, tuple[int | None, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def accepts(self, size: int) -> bool:
+        """Gibt an, ob ein Bild dieser Grösse zwischengespeichert würde."""
+        return 0 < size <= self._max_bytes // 8
+
+    def get(self, receipt_id: int) -> tuple[int | None, bytes] | None:
+        """Liefert (user_id, bild) oder None; ein Treffer rückt nach vorne."""
+        with self._lock:
+            entry = self._entries.get(receipt_id)
+            if entry is not None:
+                self._entries.move_to_end(receipt_id)
+            return entry
+
+    def set(self, receipt_id: int, user_id: int | None, image: bytes | bytearray) -> None:
+        if not self.accepts(len(image)):
+            return
+        # bytes(...) gibt ein bytes-Objekt unverändert zurück und kopiert nur Puffer.
+        image = bytes(image)
+        with self._lock:
+            previous = self._entries.pop(receipt_id, None)
+            if previous is not None:
+                self._total_bytes -= len(previous[1])
+            self._entries[receipt_id] = (user_id, image)
+            self._total_bytes += len(image)
+            while self._total_bytes > self._max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+    def invalidate(self, receipt_id: int) -> None:
+        with self._lock:
+            entry = self._entries.pop(receipt_id, None)
+            if entry is not None:
+                self._total_bytes -= len(entry[1])
+
+
+_receipt_image_cache = _ReceiptImageCache(max_bytes=RECEIPT_IMAGE_CACHE_BYTES)
+# Vorschaubilder der Belegkarten (wenige KB pro Beleg) in einem eigenen, kleineren Cache
+_receipt_thumbnail_cache = _ReceiptImageCache(max_bytes=RECEIPT_IMAGE_CACHE_BYTES // 4)
+
+
+# Eigene Worker-Threads für Datenbankaufrufe aus async-Code: höchstens so viele wie der
+# Pool Verbindungen hat. Überzählige Aufrufe warten in der Executor-Queue statt Threads
+# des Standard-Executors (asyncio.to_thread) mit Warten auf eine Verbindung zu blockieren.
+_db_executor = ThreadPoolExecutor(max_workers=max(1, POOL_MAX), thread_name_prefix="db")
+
+
+async def run_db(func, /, *args, **kwargs):
+    """
+    Führt eine (blockierende) Datenbankfunktion aus async-Code heraus aus.
+
+    Ersatz für `asyncio.to_thread` bei reinen DB-Aufrufen, z.B.
+    `await run_db(list_receipts_overview, user_id)`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _db_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+def _execute_prepared(cur, statement: str, param_types: str, params: tuple) -> None:
+    """
+    Führt ein Statement über `sp_executesql` mit typisierten Parametern aus.
+
+    pymssql setzt Parameter clientseitig als Literale in den SQL-Text ein; der Server
+    sieht dadurch bei jedem Wert einen neuen Text und kompiliert einen eigenen Plan.
+    Über sp_executesql bleibt der Text konstant, der Plan wird wiederverwendet.
+
+    Args:
+        cur: Offener Cursor.
+        statement: SQL mit benannten Parametern (z.B. '... WHERE receipt_id=@receipt_id').
+        param_types: Parameterdeklaration (z.B. '@receipt_id INT').
+        params: Werte in der Reihenfolge der Deklaration.
+    """
+    placeholders = "".join(", %s" for _ in params)
+    cur.execute(
+        f"EXEC sp_executesql %s, %s{placeholders}",
+        (statement, param_types, *params),
+    )
+
+
+def _iso(value) -> str | None:
+    """Wandelt ein Datum/Zeitstempel aus der Datenbank in einen ISO-String (sonst None)."""
+    return value.isoformat() if isinstance(value, (datetime, date)) else None
+
+
+def _num(value):
+    """Wandelt DECIMAL-Werte aus der Datenbank in float um, andere Werte bleiben."""
+    return float(value) if isinstance(value, Decimal) else value
+
+
+# Wie lange ein erfolgreicher Heartbeat wiederverwendet wird (Sekunden)
+HEARTBEAT_TTL_SECONDS = 5.0
+_heartbeat_lock = threading.Lock()  # Nur ein Check fragt gleichzeitig die Datenbank ab
+_last_heartbeat: dict = {"checked_at": 0.0, "value": None}
+
+
+def fetch_db_heartbeat() -> dict:
+    """
+    Prüft, ob die Datenbank erreichbar ist, und liefert ein paar Basisinfos zurück.
+
+    Health-Checks werden von Load-Balancern im Sekundentakt abgefragt. Ein erfolgreiches
+    Ergebnis wird deshalb `HEARTBEAT_TTL_SECONDS` lang zwischengespeichert; Fehler werden
+    nicht gespeichert, damit der nächste Aufruf es sofort erneut versucht.
+
+    Es fragt immer nur ein Aufruf gleichzeitig die Datenbank ab. Parallele Aufrufe warten
+    nicht darauf (bei einem DB-Ausfall bis zum Pool-Timeout), sondern liefern das letzte
+    erfolgreiche Ergebnis oder brechen sofort ab. So belegen Health-Checks höchstens
+    einen Thread des DB-Executors.
+
+    Returns:
+        Ein Dictionary mit 'database', 'server_name' und 'server_time' (ISO-String).
+
+    Raises:
+        RuntimeError: Wenn bereits ein Check läuft und noch kein Ergebnis vorliegt.
+    """
+    last_value = _last_heartbeat["value"]
+    if (
+        last_value is not None
+        and time.monotonic() - _last_heartbeat["checked_at"] < HEARTBEAT_TTL_SECONDS
+    ):
+        return last_value
+    if not _heartbeat_lock.acquire(blocking=False):
+        if last_value is not None:
+            return last_value
+        raise RuntimeError("Ein Health-Check der Datenbank läuft bereits.")
+    try:
+        with _get_connection(readonly=True) as conn:
+            with conn.cursor(as_dict=True) as cur:
+                cur.execute(
+                    "SELECT DB_NAME() AS database_name, @@SERVERNAME AS server_name, "
+                    "SYSUTCDATETIME() AS server_time"
+                )
+                row = cur.fetchone() or {}
+    except Exception:
+        # Parallele Aufrufe sollen den Ausfall sehen, nicht das alte Ergebnis.
+        _last_heartbeat["value"] = None
+        raise
+    finally:
+        _heartbeat_lock.release()
+
+    value = {
+        "database": row.get("database_name"),
+        "server_name": row.get("server_name"),
+        "server_time": _iso(row.get("server_time")),
+    }
+    _last_heartbeat.update(checked_at=time.monotonic(), value=value)
+    return value
+
 
 def _generate_salt() -> str:
     """Erzeugt zufälliges Salz, damit Passwörter nicht erratbar sind."""
     return secrets.token_hex(16)
 
 
-def _hash_password(password: str, salt: str) -> str:
-    """Berechnet einen Hash aus Passwort und Salz per PBKDF2."""
+def _pbkdf2_digest(password: str, salt: bytes) -> bytes:
+    """Rohes PBKDF2-Ergebnis (32 Bytes) für Passwort und Salz."""
+    if not password.isascii():
+        raise ValueError("Passwort darf nur ASCII-Zeichen enthalten.")
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
+
+
+def _scrypt_digest(password: str, salt: bytes) -> bytes:
+    """Rohes scrypt-Ergebnis (32 Bytes) für Passwort und Salz."""
     if not password.isascii():
         raise ValueError("Passwort darf nur ASCII-Zeichen enthalten.")
-    digest = hashlib.pbkdf2_hmac(
-        "sha256",
+    return hashlib.scrypt(
         password.encode("utf-8"),
-        bytes.fromhex(salt),
-        120_000,
+        salt=salt,
+        n=2**14,
+        r=8,
+        p=1,
+        dklen=32,
     )
-    return digest.hex()
+
+
+def _hash_password(password: str, salt: str) -> str:
+    """Berechnet einen Hash aus Passwort und Salz per PBKDF2."""
+    return _pbkdf2_digest(password, bytes.fromhex(salt)).hex()
+
+
+# Neue Passwörter werden mit scrypt gehasht (speicherintensiv, in C implementiert).
+# Das Präfix kennzeichnet das Verfahren, ältere PBKDF2-Hashes bleiben ohne Präfix gültig.
+_SCRYPT_PREFIX = "scrypt$"
+
+
+def _hash_password_scrypt(password: str, salt: str) -> str:
+    """Berechnet einen scrypt-Hash (mit Verfahrens-Präfix) aus Passwort und Salz."""
+    return _SCRYPT_PREFIX + _scrypt_digest(password, bytes.fromhex(salt)).hex()
+
+
+def _verify_password(password: str, salt: str, expected_hash: str) -> bool:
+    """
+    Prüft ein Passwort gegen den gespeicherten Hash (scrypt oder älteres PBKDF2).
+
+    Der gespeicherte Hex-Wert wird einmal in Bytes umgewandelt und gegen das rohe
+    Ergebnis verglichen (32 statt 64 Zeichen). `hmac.compare_digest` vergleicht in
+    konstanter Zeit, damit die Antwortzeit nichts über Übereinstimmungen verrät.
+    """
+    if expected_hash.startswith(_SCRYPT_PREFIX):
+        digest_func = _scrypt_digest
+        expected_hex = expected_hash[len(_SCRYPT_PREFIX):]
+    else:
+        digest_func = _pbkdf2_digest
+        expected_hex = expected_hash
+    try:
+        expected = bytes.fromhex(expected_hex)
+    except ValueError:
+        return False
+    calculated = digest_func(password, bytes.fromhex(salt))
+    return hmac.compare_digest(calculated, expected)
 
 
 def create_user(name: str | None, email: str, password: str) -> dict:
@@ -83,48 +555,58 @@ def create_user(name: str | None, email: str, password: str) -> dict:
     cleaned_name = name.strip() if name else None
 
     salt = _generate_salt()
-    password_hash = _hash_password(password, salt)
+    password_hash = _hash_password_scrypt(password, salt)
 
-    with pymssql.connect(**CONNECT_KW) as conn:
+    with _get_connection() as conn:
         with conn.cursor(as_dict=True) as cur:
-            cur.execute(
-                "SELECT user_id FROM app.users WHERE LOWER(email)=LOWER(%s)",
-                (cleaned_email,),
-            )
-            if cur.fetchone():
-                raise ValueError(
-                    "Für diese E-Mail-Adresse existiert bereits ein Konto."
-                )
+            # Dublettenprüfung, Benutzer und Zugangsdaten in einem einzigen Batch (ein
+            # Round-Trip). OUTPUT ... INTO @new_user hält die neue ID serverseitig fest.
+            # Ist die E-Mail schon vergeben, endet der Batch mit email_taken=1.
+            # E-Mails werden klein geschrieben gespeichert; der direkte Vergleich ohne
+            # LOWER() kann den Unique-Index UQ_users_email als Seek nutzen.
             cur.execute(
                 """
+                SET NOCOUNT ON;
+                IF EXISTS (
+                    SELECT 1 FROM app.users WITH (UPDLOCK, HOLDLOCK)
+                    WHERE email=%s
+                )
+                BEGIN
+                    SELECT CAST(1 AS BIT) AS email_taken;
+                    RETURN;
+                END;
+
+                DECLARE @new_user TABLE (
+                    user_id INT, name NVARCHAR(255), email NVARCHAR(255), creation_date DATETIME2
+                );
+
                 INSERT INTO app.users (name, email)
                 OUTPUT INSERTED.user_id, INSERTED.name, INSERTED.email, INSERTED.creation_date
-                VALUES (%s, %s)
+                INTO @new_user
+                VALUES (%s, %s);
+
+                INSERT INTO app.user_credentials (user_id, password_hash, salt)
+                SELECT user_id, %s, %s FROM @new_user;
+
+                SELECT CAST(0 AS BIT) AS email_taken, user_id, name, email, creation_date
+                FROM @new_user;
                 """,
-                (cleaned_name, cleaned_email),
+                (cleaned_email, cleaned_name, cleaned_email, password_hash, salt),
             )
             row = cur.fetchone()
+            if row and row["email_taken"]:
+                raise ValueError(
+                    "Für diese E-Mail-Adresse existiert bereits ein Konto."
+                )
             if not row:
                 raise RuntimeError("Der neue Benutzer konnte nicht angelegt werden.")
-
-            cur.execute(
-                """
-                INSERT INTO app.user_credentials (user_id, password_hash, salt)
-                VALUES (%s, %s, %s)
-                """,
-                (row["user_id"], password_hash, salt),
-            )
             conn.commit()
 
-            creation = row["creation_date"]
-            created_at = (
-                creation.isoformat() if isinstance(creation, (datetime, date)) else None
-            )
             return {
                 "user_id": row["user_id"],
                 "name": row["name"],
                 "email": row["email"],
-                "creation_date": created_at,
+                "creation_date": _iso(row["creation_date"]),
             }
 
 
@@ -144,9 +626,12 @@ def authenticate_user(email: str, password: str) -> dict:
 
     cleaned_email = email.strip().lower()
 
-    with pymssql.connect(**CONNECT_KW) as conn:
+    with _get_connection(readonly=True) as conn:
         with conn.cursor(as_dict=True) as cur:
-            cur.execute(
+            # Vergleich ohne LOWER(), damit der Unique-Index auf email genutzt wird
+            # (cleaned_email ist bereits klein geschrieben, die Spalte case-insensitiv).
+            _execute_prepared(
+                cur,
                 """
                 SELECT
                     u.user_id,
@@ -158,30 +643,27 @@ def authenticate_user(email: str, password: str) -> dict:
                 FROM app.users AS u
                 JOIN app.user_credentials AS cred
                     ON cred.user_id = u.user_id
-                WHERE LOWER(u.email)=LOWER(%s)
+                WHERE u.email=@email
                 """,
+                "@email NVARCHAR(255)",
                 (cleaned_email,),
             )
             row = cur.fetchone()
-            if not row:
-                raise ValueError("E-Mail oder Passwort ist nicht korrekt.")
 
-            expected_hash = row["password_hash"]
-            salt = row["salt"]
-            calculated_hash = _hash_password(password, salt)
-            if calculated_hash != expected_hash:
-                raise ValueError("E-Mail oder Passwort ist nicht korrekt.")
+    # Das Hashing läuft erst nach Rückgabe der Verbindung, damit sie nicht
+    # für die Dauer der Schlüsselableitung blockiert ist.
+    if not row:
+        raise ValueError("E-Mail oder Passwort ist nicht korrekt.")
 
-            creation = row["creation_date"]
-            created_at = (
-                creation.isoformat() if isinstance(creation, (datetime, date)) else None
-            )
-            return {
-                "user_id": row["user_id"],
-                "name": row["name"],
-                "email": row["email"],
-                "creation_date": created_at,
-            }
+    if not _verify_password(password, row["salt"], row["password_hash"]):
+        raise ValueError("E-Mail oder Passwort ist nicht korrekt.")
+
+    return {
+        "user_id": row["user_id"],
+        "name": row["name"],
+        "email": row["email"],
+        "creation_date": _iso(row["creation_date"]),
+    }
 
 
 def get_user_settings(user_id: int) -> dict:
@@ -197,19 +679,17 @@ def get_user_settings(user_id: int) -> dict:
     if not user_id:
         raise ValueError("Eine gültige Benutzer-ID ist erforderlich.")
 
-    with pymssql.connect(**CONNECT_KW) as conn:
+    with _get_connection(readonly=True) as conn:
         with conn.cursor(as_dict=True) as cur:
-            cur.execute(
-                "SELECT max_budget FROM app.user_settings WHERE user_id=%s",
+            _execute_prepared(
+                cur,
+                "SELECT max_budget FROM app.user_settings WHERE user_id=@user_id",
+                "@user_id INT",
                 (user_id,),
             )
             row = cur.fetchone() or {}
 
-    max_budget = row.get("max_budget")
-    if isinstance(max_budget, Decimal):
-        max_budget = float(max_budget)
-
-    return {"max_budget": max_budget}
+    return {"max_budget": _num(row.get("max_budget"))}
 
 
 def save_user_settings(user_id: int, *, max_budget: float | None = None) -> None:
@@ -229,11 +709,13 @@ def save_user_settings(user_id: int, *, max_budget: float | None = None) -> None
     else:
         normalized_budget = round(float(max_budget), 2)
 
-    with pymssql.connect(**CONNECT_KW) as conn:
+    with _get_connection(autocommit=True) as conn:
         with conn.cursor() as cur:
+            # HOLDLOCK: ohne Range-Lock können zwei parallele MERGEs beide "NOT MATCHED"
+            # sehen und denselben Benutzer doppelt einfügen (Primärschlüsselverletzung).
             cur.execute(
                 """
-                MERGE app.user_settings AS target
+                MERGE app.user_settings WITH (HOLDLOCK) AS target
                 USING (SELECT %s AS user_id, %s AS max_budget) AS source
                 ON target.user_id = source.user_id
                 WHEN MATCHED THEN
@@ -243,13 +725,21 @@ def save_user_settings(user_id: int, *, max_budget: float | None = None) -> None
                 """,
                 (user_id, normalized_budget),
             )
-            conn.commit()
+
+
+# Blockgrösse beim Schreiben von Belegbildern (ein Statement pro Block)
+RECEIPT_UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 def insert_receipt(user_id: int, content: bytes):
     """
     Speichert einen neuen Beleg (als Bild-Bytes) in der Datenbank.
 
+    pymssql setzt Binärparameter als Hex-Literal in den SQL-Text ein, ein 5 MB-Bild
+    ergäbe also ein Statement von über 10 MB. Deshalb geht mit dem INSERT nur der erste
+    Block an den Server, der Rest wird blockweise per `.WRITE` angehängt (alles in
+    derselben Transaktion).
+
     Args:
         user_id: Die ID des Benutzers, dem der Beleg gehört.
         content: Der Dateiinhalt des Belegs (z.B. ein JPG- oder PNG-Bild).
@@ -263,77 +753,131 @@ def insert_receipt(user_id: int, content: bytes):
             "Die hochgeladene Datei ist leer und kann nicht gespeichert werden."
         )
 
-    # 'with' stellt sicher, dass die Verbindung zur Datenbank automatisch geschlossen wird,
+    # Blöcke als bytearray übergeben: pymssql sendet `bytes`, die zufällig gültiges
+    # UTF-8 sind, sonst als Text-Literal statt als 0x...-Binärwert.
+    image = memoryview(content)
+
+    # 'with' stellt sicher, dass die Verbindung nach Gebrauch an den Pool zurückgeht,
     # auch wenn Fehler auftreten.
-    with pymssql.connect(**CONNECT_KW) as conn:
+    with _get_connection() as conn:
         # Ein 'cursor' wird benötigt, um SQL-Befehle auszuführen.
         # 'as_dict=True' sorgt dafür, dass die Ergebnisse als Dictionary (key-value)
         # statt als Tupel zurückgegeben werden, was den Code lesbarer macht.
         with conn.cursor(as_dict=True) as cur:
-            # 1. Überprüfen, ob der Benutzer existiert, bevor wir einen Beleg hinzufügen.
-            cur.execute(
-                "SELECT user_id FROM app.users WHERE user_id=%s",
-                (user_id,),
-            )
-            if not cur.fetchone():
-                raise ValueError(f"Benutzer mit der ID {user_id} wurde nicht gefunden.")
+            # Den neuen Beleg in die Tabelle 'receipts' einfügen.
+            # 'OUTPUT ... INTO @new_receipt' hält die Werte der eingefügten Zeile fest, das
+            # abschliessende SELECT liefert sie als einzige Ergebnismenge des Batches
+            # (funktioniert im Gegensatz zu OUTPUT ohne INTO auch mit Triggern).
+            # Ob der Benutzer existiert, prüft der Fremdschlüssel FK_receipts_users;
+            # eine vorgelagerte SELECT-Abfrage (und damit ein Round-Trip) entfällt.
+            try:
+                cur.execute(
+                    """
+                    SET NOCOUNT ON;
+                    DECLARE @new_receipt TABLE (
+                        receipt_id INT, upload_date DATETIME2, status_id INT
+                    );
 
-            # 2. Den neuen Beleg in die Tabelle 'receipts' einfügen.
-            # 'OUTPUT INSERTED.*' gibt die Werte der gerade eingefügten Zeile zurück.
-            cur.execute(
-                """
-                INSERT INTO app.receipts (user_id, receipt_image)
-                OUTPUT INSERTED.receipt_id, INSERTED.upload_date, INSERTED.status_id
-                VALUES (%s, %s)
-                """,
-                (
-                    user_id,
-                    content,
-                ),  # Die Parameter werden sicher eingefügt, um SQL-Injection zu verhindern.
-            )
+                    INSERT INTO app.receipts (user_id, receipt_image)
+                    OUTPUT INSERTED.receipt_id, INSERTED.upload_date, INSERTED.status_id
+                    INTO @new_receipt
+                    VALUES (%s, %s);
+
+                    SELECT receipt_id, upload_date, status_id FROM @new_receipt;
+                    """,
+                    (
+                        user_id,
+                        bytearray(image[:RECEIPT_UPLOAD_CHUNK_SIZE]),
+                    ),  # Die Parameter werden sicher eingefügt, um SQL-Injection zu verhindern.
+                )
+            except pymssql.IntegrityError as exc:
+                # 547 = Verletzung einer FOREIGN KEY-Einschränkung
+                if exc.args and exc.args[0] == 547:
+                    raise ValueError(
+                        f"Benutzer mit der ID {user_id} wurde nicht gefunden."
+                    ) from exc
+                raise
             row = cur.fetchone()  # Das Ergebnis der 'OUTPUT'-Klausel abrufen.
 
+            # Restliche Blöcke anhängen (.WRITE mit Offset NULL schreibt ans Ende).
+            for offset in range(
+                RECEIPT_UPLOAD_CHUNK_SIZE, len(image), RECEIPT_UPLOAD_CHUNK_SIZE
+            ):
+                _execute_prepared(
+                    cur,
+                    """
+                    UPDATE app.receipts
+                    SET receipt_image.WRITE(@chunk, NULL, NULL)
+                    WHERE receipt_id=@receipt_id
+                    """,
+                    "@chunk VARBINARY(MAX), @receipt_id INT",
+                    (
+                        bytearray(image[offset : offset + RECEIPT_UPLOAD_CHUNK_SIZE]),
+                        row["receipt_id"],
+                    ),
+                )
+
             # 'commit()' speichert die Änderungen dauerhaft in der Datenbank.
             conn.commit()
 
-            # Die zurückgegebenen Daten für die weitere Verwendung vorbereiten.
-            return {
-                "receipt_id": row["receipt_id"],
-                "upload_date": row[
-                    "upload_date"
-                ].isoformat(),  # Datum in einen Standard-String umwandeln
-                "status_id": row["status_id"],
-            }
+    # Direkt nach dem Upload folgt die Analyse, die das Bild sonst sofort wieder lädt.
+    _receipt_image_cache.set(row["receipt_id"], user_id, content)
+
+    # Die zurückgegebenen Daten für die weitere Verwendung vorbereiten.
+    return {
+        "receipt_id": row["receipt_id"],
+        "upload_date": _iso(row["upload_date"]),  # Datum in einen Standard-String umwandeln
+        "status_id": row["status_id"],
+    }
+
+
+# Anzahl Zeilen, die list_receipts_overview() pro fetchmany()-Aufruf abholt.
+RECEIPT_OVERVIEW_FETCH_SIZE = 500
 
 
-def list_receipts_overview(user_id: int | None = None) -> list[dict]:
+def list_receipts_overview(
+    user_id: int | None = None, *, limit: int | None = None, offset: int = 0
+) -> list[dict]:
     """
     Liefert eine kompakte Ǭbersicht aller Belege mit den wichtigsten Transaktionsinformationen.
 
     Args:
         user_id: Optionaler Filter, um nur Belege eines bestimmten Benutzers zurǬckzugeben.
+        limit: Maximale Anzahl Zeilen (Seitengrösse); None liefert alle Belege.
+        offset: Anzahl Zeilen, die vorher übersprungen werden (nur mit `limit`).
 
     Returns:
         Eine Liste von Dictionaries pro Beleg mit Status, Betrag, Kategorie usw.
     """
-    params = (user_id, user_id)
-    with pymssql.connect(**CONNECT_KW) as conn:
-        with conn.cursor(as_dict=True) as cur:
-            cur.execute(
-                """
+    # Zwei feste Statement-Texte (mit/ohne Benutzerfilter) statt "(%s IS NULL OR ...)":
+    # der Text bleibt über alle Aufrufe gleich, der Plan wird wiederverwendet und der
+    # Filter auf user_id liest über IX_receipts_user_upload bereits sortiert.
+    where_clause = "WHERE r.user_id = @user_id" if user_id is not None else ""
+    # Mit Seitengrösse liest der Server nur die Zeilen der angefragten Seite.
+    page_clause = (
+        "OFFSET @offset ROWS FETCH NEXT @limit ROWS ONLY" if limit is not None else ""
+    )
+    overview: list[dict] = []
+    with _get_connection(readonly=True) as conn:
+        # Tupel-Cursor: die Spalten werden direkt entpackt statt 16 dict-Zugriffe pro Zeile.
+        with conn.cursor() as cur:
+            cur.arraysize = RECEIPT_OVERVIEW_FETCH_SIZE
+            _execute_prepared(
+                cur,
+                f"""
                 SELECT
                     r.receipt_id,
                     r.user_id,
-                    r.upload_date,
+                    CONVERT(VARCHAR(33), r.upload_date, 126) AS upload_date,
                     r.status_id,
                     s.status_name,
                     r.issuer_name,
                     r.issuer_city,
                     r.issuer_country,
-                    CASE WHEN DATALENGTH(r.receipt_image) > 0 THEN 1 ELSE 0 END AS has_image,
-                    t.amount,
+                    CAST(CASE WHEN DATALENGTH(r.receipt_image) > 0 THEN 1 ELSE 0 END AS BIT) AS has_image,
+                    CAST(t.amount AS FLOAT) AS amount,
                     t.currency,
-                    t.[date]       AS transaction_date,
+                    CONVERT(VARCHAR(10), t.[date], 126) AS transaction_date,
                     t.[description] AS description,
                     t.[type]       AS transaction_type,
                     c.name         AS category_name,
@@ -345,58 +889,68 @@ def list_receipts_overview(user_id: int | None = None) -> list[dict]:
                     ON t.category_id = c.category_id
                 LEFT JOIN app.receipt_status AS s
                     ON r.status_id = s.status_id
-                WHERE (%s IS NULL OR r.user_id = %s)
+                {where_clause}
                 ORDER BY r.upload_date DESC, r.receipt_id DESC
+                {page_clause}
                 """,
-                params,
+                "@user_id INT, @offset INT, @limit INT",
+                (user_id, max(0, offset), limit),
             )
-            rows = cur.fetchall() or []
-
-    overview: list[dict] = []
-    for row in rows:
-        amount = row.get("amount")
-        if isinstance(amount, Decimal):
-            amount = float(amount)
-
-        tx_date = row.get("transaction_date")
-        if isinstance(tx_date, (date, datetime)):
-            tx_date_iso = tx_date.isoformat()
-        else:
-            tx_date_iso = None
-
-        upload_date = row.get("upload_date")
-        if isinstance(upload_date, (date, datetime)):
-            upload_iso = upload_date.isoformat()
-        else:
-            upload_iso = None
-
-        overview.append(
-            {
-                "receipt_id": row.get("receipt_id"),
-                "user_id": row.get("user_id"),
-                "upload_date": upload_iso,
-                "status_id": row.get("status_id"),
-                "status_name": row.get("status_name"),
-                "issuer_name": row.get("issuer_name"),
-                "issuer_city": row.get("issuer_city"),
-                "issuer_country": row.get("issuer_country"),
-                "has_image": bool(row.get("has_image")),
-                "amount": amount,
-                "currency": row.get("currency"),
-                "transaction_date": tx_date_iso,
-                "description": row.get("description"),
-                "transaction_type": row.get("transaction_type"),
-                "category_name": row.get("category_name"),
-                "category_type": row.get("category_type"),
-            }
-        )
+            # Blockweise abholen und direkt umwandeln, statt erst alles zu puffern.
+            # Betrag, Datumswerte und has_image kommen bereits als float, ISO-String bzw. BIT
+            # (bool) vom Server, die Zeile wird nur noch in ein dict gepackt.
+            while rows := cur.fetchmany(cur.arraysize):
+                overview.extend(
+                    {
+                        "receipt_id": receipt_id,
+                        "user_id": owner_id,
+                        "upload_date": upload_date,
+                        "status_id": status_id,
+                        "status_name": status_name,
+                        "issuer_name": issuer_name,
+                        "issuer_city": issuer_city,
+                        "issuer_country": issuer_country,
+                        "has_image": has_image,
+                        "amount": amount,
+                        "currency": currency,
+                        "transaction_date": tx_date,
+                        "description": description,
+                        "transaction_type": transaction_type,
+                        "category_name": category_name,
+                        "category_type": category_type,
+                    }
+                    for (
+                        receipt_id,
+                        owner_id,
+                        upload_date,
+                        status_id,
+                        status_name,
+                        issuer_name,
+                        issuer_city,
+                        issuer_country,
+                        has_image,
+                        amount,
+                        currency,
+                        tx_date,
+                        description,
+                        transaction_type,
+                        category_name,
+                        category_type,
+                    ) in rows
+                )
 
     return overview
 
 
 def get_receipt_detail(receipt_id: int) -> dict:
     """
-    Holt alle Details zu einem einzelnen Beleg einschlie�Ylich Bild, Transaktion und Ausstellerinfos.
+    Holt alle Details zu einem einzelnen Beleg einschlie�Ylich Transaktion und Ausstellerinfos.
+
+    Das Bild selbst wird nicht mitgeladen (nur 'has_image'); dafür gibt es
+    `load_receipt_image` bzw. den Endpunkt /api/receipts/{id}/image.
+
+    Die Rohzeile wird kurz zwischengespeichert (`_receipt_detail_cache`); jeder Aufruf
+    baut daraus ein neues Dictionary, Aufrufer können das Ergebnis also frei verändern.
 
     Args:
         receipt_id: Die ID des gesuchten Belegs.
@@ -404,14 +958,57 @@ def get_receipt_detail(receipt_id: int) -> dict:
     Returns:
         Ein Dictionary mit allen relevanten Detailinformationen.
     """
-    with pymssql.connect(**CONNECT_KW) as conn:
+    row = _receipt_detail_cache.get(receipt_id)
+    if row is _TTLCache._MISSING:
+        row = _fetch_receipt_detail_row(receipt_id)
+        if not row:
+            raise ValueError(f"Beleg mit der ID {receipt_id} wurde nicht gefunden.")
+        _receipt_detail_cache.set(receipt_id, row)
+
+    # Betrag (float) und Datumswerte (ISO-Strings) werden bereits im SELECT umgewandelt.
+    return {
+        "receipt_id": row.get("receipt_id"),
+        "user_id": row.get("user_id"),
+        "upload_date": row.get("upload_date"),
+        "status_id": row.get("status_id"),
+        "status_name": row.get("status_name"),
+        "extracted_text": row.get("extracted_text"),
+        "error_message": row.get("error_message"),
+        "issuer": {
+            "name": row.get("issuer_name"),
+            "street": row.get("issuer_street"),
+            "city": row.get("issuer_city"),
+            "postal_code": row.get("issuer_postal_code"),
+            "country": row.get("issuer_country"),
+            "latitude": row.get("issuer_latitude"),
+            "longitude": row.get("issuer_longitude"),
+        },
+        "has_image": row["has_image"],
+        "transaction": {
+            "transaction_id": row.get("transaction_id"),
+            "amount": row.get("amount"),
+            "currency": row.get("currency"),
+            "date": row.get("transaction_date"),
+            "description": row.get("description"),
+            "type": row.get("transaction_type"),
+            "category_id": row.get("category_id"),
+            "category_name": row.get("category_name"),
+            "category_type": row.get("category_type"),
+        },
+    }
+
+
+def _fetch_receipt_detail_row(receipt_id: int) -> dict | None:
+    """Liest die Detailzeile eines Belegs (ohne Bild) über den Lese-Pool."""
+    with _get_connection(readonly=True) as conn:
         with conn.cursor(as_dict=True) as cur:
-            cur.execute(
+            _execute_prepared(
+                cur,
                 """
                 SELECT
                     r.receipt_id,
                     r.user_id,
-                    r.upload_date,
+                    CONVERT(VARCHAR(33), r.upload_date, 126) AS upload_date,
                     r.status_id,
                     s.status_name,
                     r.extracted_text,
@@ -423,11 +1020,11 @@ def get_receipt_detail(receipt_id: int) -> dict:
                     r.issuer_country,
                     r.issuer_latitude,
                     r.issuer_longitude,
-                    r.receipt_image,
+                    CAST(CASE WHEN DATALENGTH(r.receipt_image) > 0 THEN 1 ELSE 0 END AS BIT) AS has_image,
                     t.transaction_id,
-                    t.amount,
+                    CAST(t.amount AS FLOAT) AS amount,
                     t.currency,
-                    t.[date]        AS transaction_date,
+                    CONVERT(VARCHAR(10), t.[date], 126) AS transaction_date,
                     t.[description] AS description,
                     t.[type]        AS transaction_type,
                     c.category_id,
@@ -440,61 +1037,12 @@ def get_receipt_detail(receipt_id: int) -> dict:
                     ON t.category_id = c.category_id
                 LEFT JOIN app.receipt_status AS s
                     ON r.status_id = s.status_id
-                WHERE r.receipt_id = %s
+                WHERE r.receipt_id = @receipt_id
                 """,
+                "@receipt_id INT",
                 (receipt_id,),
             )
-            row = cur.fetchone()
-
-    if not row:
-        raise ValueError(f"Beleg mit der ID {receipt_id} wurde nicht gefunden.")
-
-    amount = row.get("amount")
-    if isinstance(amount, Decimal):
-        amount = float(amount)
-
-    tx_date = row.get("transaction_date")
-    if isinstance(tx_date, (date, datetime)):
-        tx_date_iso = tx_date.isoformat()
-    else:
-        tx_date_iso = None
-
-    upload_date = row.get("upload_date")
-    if isinstance(upload_date, (date, datetime)):
-        upload_iso = upload_date.isoformat()
-    else:
-        upload_iso = None
-
-    return {
-        "receipt_id": row.get("receipt_id"),
-        "user_id": row.get("user_id"),
-        "upload_date": upload_iso,
-        "status_id": row.get("status_id"),
-        "status_name": row.get("status_name"),
-        "extracted_text": row.get("extracted_text"),
-        "error_message": row.get("error_message"),
-        "issuer": {
-            "name": row.get("issuer_name"),
-            "street": row.get("issuer_street"),
-            "city": row.get("issuer_city"),
-            "postal_code": row.get("issuer_postal_code"),
-            "country": row.get("issuer_country"),
-            "latitude": row.get("issuer_latitude"),
-            "longitude": row.get("issuer_longitude"),
-        },
-        "receipt_image": row.get("receipt_image"),
-        "transaction": {
-            "transaction_id": row.get("transaction_id"),
-            "amount": amount,
-            "currency": row.get("currency"),
-            "date": tx_date_iso,
-            "description": row.get("description"),
-            "type": row.get("transaction_type"),
-            "category_id": row.get("category_id"),
-            "category_name": row.get("category_name"),
-            "category_type": row.get("category_type"),
-        },
-    }
+            return cur.fetchone()
 
 
 def delete_receipt(receipt_id: int, *, user_id: int | None = None) -> None:
@@ -508,37 +1056,28 @@ def delete_receipt(receipt_id: int, *, user_id: int | None = None) -> None:
     if not receipt_id:
         raise ValueError("Es muss eine g?ltige Receipt-ID angegeben werden.")
 
-    with pymssql.connect(**CONNECT_KW) as conn:
-        with conn.cursor(as_dict=True) as cur:
-            if user_id is None:
-                cur.execute(
-                    "SELECT receipt_id FROM app.receipts WHERE receipt_id=%s",
-                    (receipt_id,),
-                )
-            else:
-                cur.execute(
-                    """
-                    SELECT receipt_id
-                    FROM app.receipts
-                    WHERE receipt_id=%s AND user_id=%s
-                    """,
-                    (receipt_id, user_id),
-                )
+    # Besitzprüfung und Löschen in einem einzigen Statement (Autocommit). Die Verweise
+    # aus app.transactions setzt der Fremdschlüssel (ON DELETE SET NULL) selbst zurück.
+    owner_filter = "AND user_id=@user_id" if user_id is not None else ""
+    with _get_connection(autocommit=True) as conn:
+        with conn.cursor() as cur:
+            _execute_prepared(
+                cur,
+                f"""
+                DELETE FROM app.receipts
+                OUTPUT DELETED.receipt_id
+                WHERE receipt_id=@receipt_id {owner_filter}
+                """,
+                "@receipt_id INT, @user_id INT",
+                (receipt_id, user_id),
+            )
             if not cur.fetchone():
                 raise ValueError(
                     "Beleg wurde nicht gefunden oder geh?rt einem anderen Benutzer."
                 )
-
-        with conn.cursor() as cur:
-            cur.execute(
-                "UPDATE app.transactions SET receipt_id=NULL WHERE receipt_id=%s",
-                (receipt_id,),
-            )
-            cur.execute(
-                "DELETE FROM app.receipts WHERE receipt_id=%s",
-                (receipt_id,),
-            )
-            conn.commit()
+    _receipt_image_cache.invalidate(receipt_id)
+    _receipt_thumbnail_cache.invalidate(receipt_id)
+    _receipt_detail_cache.invalidate(receipt_id)
 
 
 def delete_transactions_for_receipt(receipt_id: int) -> int:
@@ -554,41 +1093,295 @@ def delete_transactions_for_receipt(receipt_id: int) -> int:
     if not receipt_id:
         raise ValueError("Es muss eine g?ltige Receipt-ID angegeben werden.")
 
-    with pymssql.connect(**CONNECT_KW) as conn:
+    with _get_connection(autocommit=True) as conn:
         with conn.cursor() as cur:
             cur.execute(
                 "DELETE FROM app.transactions WHERE receipt_id=%s",
                 (receipt_id,),
             )
             deleted = cur.rowcount or 0
-            conn.commit()
-            return deleted
+    _receipt_detail_cache.invalidate(receipt_id)
+    return deleted
+
+
+# Blockgröße für das gestreamte Auslesen von Belegbildern (ein Round-Trip pro Block)
+RECEIPT_IMAGE_CHUNK_SIZE = 256 * 1024
+# Länge des Dateikopfs, aus dem der MIME-Typ bestimmt wird (längste Signatur: HEIF, 12 Bytes)
+RECEIPT_IMAGE_SIGNATURE_LENGTH = 16
+
+
+def _read_receipt_image_head(
+    cur, receipt_id: int, chunk_size: int, start: int = 0
+) -> dict:
+    """
+    Liest Metadaten, Gesamtgrösse, Dateikopf (Signatur) und den ersten Bildblock
+    (ab Byte `start`) eines Belegs in einer Abfrage.
+
+    Raises:
+        ValueError: Wenn der Beleg nicht existiert.
+    """
+    _execute_prepared(
+        cur,
+        """
+        SELECT receipt_id,
+               user_id,
+               DATALENGTH(receipt_image) AS size,
+               SUBSTRING(receipt_image, 1, @signature_length) AS signature,
+               SUBSTRING(receipt_image, @offset, @length) AS chunk
+        FROM app.receipts
+        WHERE receipt_id=@receipt_id
+        """,
+        "@signature_length INT, @offset INT, @length INT, @receipt_id INT",
+        (RECEIPT_IMAGE_SIGNATURE_LENGTH, start + 1, chunk_size, receipt_id),
+    )
+    row = cur.fetchone()
+    if not row:
+        raise ValueError(f"Beleg mit der ID {receipt_id} nicht gefunden.")
+    return row
+
+
+def _select_receipt_image_chunk(cur, receipt_id: int, offset: int, length: int) -> bytes | None:
+    """Liest `length` Bytes des Bildes ab Byte `offset` (0-basiert; SUBSTRING zählt ab 1)."""
+    _execute_prepared(
+        cur,
+        """
+        SELECT SUBSTRING(receipt_image, @offset, @length) AS chunk
+        FROM app.receipts
+        WHERE receipt_id=@receipt_id
+        """,
+        "@offset INT, @length INT, @receipt_id INT",
+        (offset + 1, length, receipt_id),
+    )
+    row = cur.fetchone()
+    return row["chunk"] if row else None
+
 
+def _iter_remaining_image_chunks(
+    cur, receipt_id: int, stop: int, chunk_size: int, start: int = 0
+) -> Iterator[bytes]:
+    """
+    Liefert die Bildblöcke nach dem ersten, bis ausschliesslich Byte `stop`.
 
-def load_receipt_image(receipt_id: int) -> dict:
+    `start` ist die Position des ersten Blocks (0-basiert).
+    """
+    offset = start + chunk_size
+    while offset < stop:
+        chunk = _select_receipt_image_chunk(
+            cur, receipt_id, offset, min(chunk_size, stop - offset)
+        )
+        if not chunk:
+            break
+        yield chunk
+        offset += chunk_size
+
+
+def _read_receipt_image_chunk(receipt_id: int, offset: int, length: int) -> bytes | None:
+    """Liest einen einzelnen Bildblock mit einer nur dafür ausgeliehenen Verbindung."""
+    with _get_connection(readonly=True) as conn:
+        with conn.cursor(as_dict=True) as cur:
+            return _select_receipt_image_chunk(cur, receipt_id, offset, length)
+
+
+def load_receipt_image(receipt_id: int, *, populate_cache: bool = True) -> dict:
     """
     Lädt das Bild und die zugehörigen Metadaten für eine bestimmte Beleg-ID.
 
+    Das Bild wird blockweise in einen vorab angelegten Puffer der passenden Grösse
+    gelesen und als unveränderliches `bytes` zurückgegeben. Dasselbe Objekt landet im
+    In-Memory-Cache und wird bei Treffern ohne Kopie geteilt.
+
     Args:
         receipt_id: Die ID des Belegs, der geladen werden soll.
+        populate_cache: False, wenn das Bild nur einmal gebraucht wird (z.B. zum
+            Erzeugen eines Vorschaubilds) und keine anderen Bilder aus dem Cache
+            verdrängen soll. Ein vorhandener Cache-Eintrag wird trotzdem genutzt.
 
     Returns:
-        Ein Dictionary, das 'receipt_id', 'user_id' und 'receipt_image' (als Bytes) enthält.
+        Ein Dictionary, das 'receipt_id', 'user_id' und 'receipt_image' (Bytes) enthält.
     """
-    with pymssql.connect(**CONNECT_KW) as conn:
+    cached = _receipt_image_cache.get(receipt_id)
+    if cached is not None:
+        user_id, image = cached
+        return {"receipt_id": receipt_id, "user_id": user_id, "receipt_image": image}
+
+    chunk_size = RECEIPT_IMAGE_CHUNK_SIZE
+    with _get_connection(readonly=True) as conn:
         with conn.cursor(as_dict=True) as cur:
-            cur.execute(
-                """
-                SELECT receipt_id, user_id, receipt_image
-                FROM app.receipts
-                WHERE receipt_id=%s
+            head = _read_receipt_image_head(cur, receipt_id, chunk_size)
+            total_size = head["size"] or 0
+            buffer = bytearray(total_size)
+            first_chunk = head["chunk"] or b""
+            buffer[: len(first_chunk)] = first_chunk
+            position = len(first_chunk)
+            for chunk in _iter_remaining_image_chunks(
+                cur, receipt_id, total_size, chunk_size
+            ):
+                buffer[position : position + len(chunk)] = chunk
+                position += len(chunk)
+
+    image = bytes(buffer)
+    del buffer
+    if populate_cache:
+        _receipt_image_cache.set(receipt_id, head["user_id"], image)
+    return {
+        "receipt_id": head["receipt_id"],
+        "user_id": head["user_id"],
+        "receipt_image": image,
+    }
+
+
+def get_cached_receipt_image(receipt_id: int) -> bytes | None:
+    """Liefert das Belegbild aus dem In-Memory-Cache oder None (ohne Datenbankzugriff)."""
+    cached = _receipt_image_cache.get(receipt_id)
+    return cached[1] if cached is not None else None
+
+
+def get_cached_receipt_thumbnail(receipt_id: int) -> bytes | None:
+    """Liefert das zwischengespeicherte Vorschaubild eines Belegs oder None."""
+    cached = _receipt_thumbnail_cache.get(receipt_id)
+    return cached[1] if cached is not None else None
+
+
+def cache_receipt_thumbnail(receipt_id: int, user_id: int | None, thumbnail: bytes) -> None:
+    """Legt ein erzeugtes Vorschaubild ab; `delete_receipt` entfernt es wieder."""
+    _receipt_thumbnail_cache.set(receipt_id, user_id, thumbnail)
+
+
+def iter_receipt_image(
+    receipt_id: int,
+    *,
+    chunk_size: int = RECEIPT_IMAGE_CHUNK_SIZE,
+    start: int = 0,
+    end: int | None = None,
+    info: dict | None = None,
+) -> Iterator[bytes]:
+    """
+    Liefert das Belegbild blockweise, ohne das ganze VARBINARY(MAX) auf einmal zu laden.
+
+    Jeder Block wird per `SUBSTRING(receipt_image, offset, länge)` gelesen, sodass
+    pro Aufruf höchstens `chunk_size` Bytes aus der Datenbank kommen. Jeder Block leiht
+    sich eine Verbindung nur für seine eigene Abfrage aus; ein langsamer Client hält
+    so zwischen zwei Blöcken keinen Platz im Pool belegt. Bilder aus dem
+    In-Memory-Cache werden ohne Datenbankzugriff ausgeliefert.
+
+    Args:
+        receipt_id: Die ID des Belegs.
+        chunk_size: Maximale Anzahl Bytes pro Block.
+        start: Erstes zu liefernde Byte (0-basiert, für HTTP-Range-Anfragen).
+        end: Letztes zu liefernde Byte (inklusive) oder None für "bis zum Ende".
+        info: Optionales Dictionary, das vor dem ersten Block mit 'size'
+            (Gesamtgrösse des Bildes in Bytes) und 'signature' (die ersten Bytes des
+            Bildes, auch bei `start` > 0) befüllt wird.
+
+    Yields:
+        Die Bildbytes in Blöcken von höchstens `chunk_size` Bytes.
+
+    Raises:
+        ValueError: Wenn der Beleg nicht existiert (beim ersten `next()`).
+    """
+    if info is None:
+        info = {}
+    cached = _receipt_image_cache.get(receipt_id)
+    if cached is not None:
+        image = memoryview(cached[1])
+        info["size"] = len(image)
+        info["signature"] = cached[1][:RECEIPT_IMAGE_SIGNATURE_LENGTH]
+        stop = len(image) if end is None else min(end + 1, len(image))
+        for offset in range(start, stop, chunk_size):
+            yield bytes(image[offset : min(offset + chunk_size, stop)])
+        return
+
+    first_length = chunk_size if end is None else max(0, min(chunk_size, end - start + 1))
+    with _get_connection(readonly=True) as conn:
+        with conn.cursor(as_dict=True) as cur:
+            # Erster Block und Gesamtgrösse kommen in derselben Abfrage.
+            head = _read_receipt_image_head(cur, receipt_id, first_length, start)
+    total_size = head["size"] or 0
+    info["size"] = total_size
+    info["signature"] = head["signature"]
+    stop = total_size if end is None else min(end + 1, total_size)
+    # Vollständig gestreamte kleine Bilder werden mitgesammelt und danach gecacht.
+    collected = (
+        bytearray()
+        if start == 0 and end is None and _receipt_image_cache.accepts(total_size)
+        else None
+    )
+    if head["chunk"]:
+        if collected is not None:
+            collected += head["chunk"]
+        yield head["chunk"]
+    offset = start + first_length
+    while offset < stop:
+        chunk = _read_receipt_image_chunk(receipt_id, offset, min(chunk_size, stop - offset))
+        if not chunk:
+            break
+        if collected is not None:
+            collected += chunk
+        yield chunk
+        offset += len(chunk)
+
+    if collected is not None and len(collected) == total_size:
+        _receipt_image_cache.set(receipt_id, head["user_id"], collected)
+
+
+# Spalten, die update_receipt_processed() setzen darf, samt SQL-Typ für sp_executesql
+_RECEIPT_UPDATE_COLUMNS = {
+    "status_id": "INT",
+    "extracted_text": "NVARCHAR(MAX)",
+    "error_message": "NVARCHAR(MAX)",
+    "issuer_name": "NVARCHAR(255)",
+    "issuer_street": "NVARCHAR(255)",
+    "issuer_city": "NVARCHAR(100)",
+    "issuer_postal_code": "NVARCHAR(20)",
+    "issuer_country": "NVARCHAR(100)",
+    "issuer_latitude": "DECIMAL(9,6)",
+    "issuer_longitude": "DECIMAL(9,6)",
+}
+
+
+def update_receipt_processed(receipt_id: int, **fields) -> None:
+    """
+    Aktualisiert Status, Analyse-Ergebnis und Ausstellerdaten eines Belegs in einem einzigen UPDATE.
+
+    Nur die übergebenen Felder werden geschrieben, alle anderen Spalten bleiben unverändert.
+    Ein explizites None setzt die Spalte auf NULL. So kann die Analyse Status und Aussteller
+    mit einem Round-Trip (und einer Zeilensperre) speichern.
+
+    Args:
+        receipt_id: Die ID des zu aktualisierenden Belegs.
+        **fields: Beliebige Spalten aus `_RECEIPT_UPDATE_COLUMNS`
+            (z.B. status_id=2, extracted_text="...", issuer_name="Migros").
+
+    Raises:
+        ValueError: Wenn ein unbekanntes Feld übergeben wird.
+    """
+    unknown = set(fields) - _RECEIPT_UPDATE_COLUMNS.keys()
+    if unknown:
+        raise ValueError(f"Unbekannte Belegfelder: {', '.join(sorted(unknown))}")
+    if not fields:
+        return
+
+    # Feste Spaltenreihenfolge, damit gleiche Feldkombinationen denselben Statement-Text
+    # (und damit denselben Plan) ergeben.
+    columns = [column for column in _RECEIPT_UPDATE_COLUMNS if column in fields]
+    set_clause = ",\n                    ".join(f"{column}=@{column}" for column in columns)
+    param_types = ", ".join(
+        f"@{column} {_RECEIPT_UPDATE_COLUMNS[column]}" for column in columns
+    )
+
+    with _get_connection(autocommit=True) as conn:
+        with conn.cursor() as cur:
+            _execute_prepared(
+                cur,
+                f"""
+                UPDATE app.receipts
+                SET {set_clause}
+                WHERE receipt_id=@receipt_id
                 """,
-                (receipt_id,),
+                f"{param_types}, @receipt_id INT",
+                (*(fields[column] for column in columns), receipt_id),
             )
-            row = cur.fetchone()
-            if not row:
-                raise ValueError(f"Beleg mit der ID {receipt_id} nicht gefunden.")
-            return row
+    _receipt_detail_cache.invalidate(receipt_id)
 
 
 def mark_receipt_status(
@@ -609,24 +1402,18 @@ def mark_receipt_status(
         extracted_text: Der aus dem Beleg extrahierte Text (optional).
         error_message: Eine Fehlermeldung, falls bei der Verarbeitung etwas schiefgelaufen ist (optional).
     """
-    with pymssql.connect(**CONNECT_KW) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE app.receipts
-                SET status_id=%s,
-                    extracted_text=%s,
-                    error_message=%s
-                WHERE receipt_id=%s
-                """,
-                (status_id, extracted_text, error_message, receipt_id),
-            )
-            conn.commit()
+    update_receipt_processed(
+        receipt_id,
+        status_id=status_id,
+        extracted_text=extracted_text,
+        error_message=error_message,
+    )
 
 
 # Standardwerte für automatisch angelegte Konten, falls in .env definiert
 AUTO_ACCOUNT_NAME = os.getenv("AUTO_ACCOUNT_NAME", "Standardkonto")
 AUTO_ACCOUNT_CURRENCY = os.getenv("AUTO_ACCOUNT_CURRENCY", "CHF")
+_ZERO_BALANCE = Decimal("0.00")  # Startsaldo neuer Konten (einmalig statt pro Aufruf geparst)
 
 
 def get_primary_account_id(user_id: int) -> int:
@@ -639,39 +1426,63 @@ def get_primary_account_id(user_id: int) -> int:
     Returns:
         Die ID des Hauptkontos.
     """
-    with pymssql.connect(**CONNECT_KW) as conn:
+    cached = _primary_account_cache.get(user_id)
+    if cached is not _TTLCache._MISSING:
+        return cached
+
+    # Suche und (falls nötig) Anlage laufen in einem einzigen Batch: das spart einen
+    # Round-Trip und UPDLOCK/HOLDLOCK verhindert, dass zwei parallele Aufrufe je ein
+    # eigenes Standardkonto anlegen.
+    # Der Kontoname ("<AUTO_ACCOUNT_NAME> yyyyMMddHHmmss") wird direkt auf dem Server
+    # aus SYSUTCDATETIME() gebildet.
+    with _get_connection() as conn:
         with conn.cursor(as_dict=True) as cur:
-            # Zuerst versuchen, ein existierendes Konto zu finden.
             cur.execute(
                 """
-                SELECT TOP 1 account_id
-                FROM app.accounts
+                SET NOCOUNT ON;
+                DECLARE @account_id INT;
+
+                SELECT TOP 1 @account_id = account_id
+                FROM app.accounts WITH (UPDLOCK, HOLDLOCK)
                 WHERE user_id=%s
-                ORDER BY account_id
+                ORDER BY account_id;
+
+                IF @account_id IS NULL
+                BEGIN
+                    DECLARE @now DATETIME2 = SYSUTCDATETIME();
+                    INSERT INTO app.accounts (user_id, account_name, balance, currency)
+                    VALUES (
+                        %s,
+                        CONCAT(
+                            %s, N' ',
+                            CONVERT(char(8), @now, 112),
+                            REPLACE(CONVERT(char(8), @now, 108), ':', '')
+                        ),
+                        %s,
+                        %s
+                    );
+                    SET @account_id = CAST(SCOPE_IDENTITY() AS INT);
+                END;
+
+                SELECT @account_id AS account_id;
                 """,
-                (user_id,),
+                (
+                    user_id,
+                    user_id,
+                    AUTO_ACCOUNT_NAME,
+                    _ZERO_BALANCE,
+                    AUTO_ACCOUNT_CURRENCY,
+                ),
             )
             row = cur.fetchone()
-            if row:
-                return row["account_id"]
-
-            # Wenn kein Konto gefunden wurde, ein neues Standardkonto anlegen.
-            account_name = f"{AUTO_ACCOUNT_NAME} {datetime.utcnow():%Y%m%d%H%M%S}"
-            cur.execute(
-                """
-                INSERT INTO app.accounts (user_id, account_name, balance, currency)
-                OUTPUT INSERTED.account_id
-                VALUES (%s, %s, %s, %s)
-                """,
-                (user_id, account_name, Decimal("0.00"), AUTO_ACCOUNT_CURRENCY),
-            )
-            new_row = cur.fetchone()
+            # Commit auch ohne Neuanlage, damit die Sperren sofort freigegeben werden.
             conn.commit()
 
-            if not new_row:
+            if not row or row["account_id"] is None:
                 raise RuntimeError("Das Standardkonto konnte nicht erstellt werden.")
 
-            return new_row["account_id"]
+            _primary_account_cache.set(user_id, row["account_id"])
+            return row["account_id"]
 
 
 def get_category_id_by_name(category_name: str) -> int | None:
@@ -684,30 +1495,51 @@ def get_category_id_by_name(category_name: str) -> int | None:
     Returns:
         Die ID der Kategorie oder None, wenn keine passende Kategorie gefunden wurde.
     """
-    with pymssql.connect(**CONNECT_KW) as conn:
+    # Normalisierung vor dem Cache-Zugriff, damit "Lebensmittel" und "lebensmittel"
+    # denselben Eintrag treffen. Auch "nicht gefunden" wird bis zum Ablauf gemerkt.
+    # Der kleingeschriebene Name wird direkt gegen die indexierte Spalte name_lower
+    # verglichen (Index-Seek statt LOWER(name) über alle Zeilen).
+    cache_key = (category_name or "").lower()
+    cached = _category_id_cache.get(cache_key)
+    if cached is not _TTLCache._MISSING:
+        return cached
+
+    with _get_connection(readonly=True) as conn:
         with conn.cursor(as_dict=True) as cur:
-            cur.execute(
+            _execute_prepared(
+                cur,
                 """
                 SELECT category_id
                 FROM app.categories
-                WHERE LOWER(name)=LOWER(%s)
+                WHERE name_lower=@category_name
                 """,
-                (category_name,),
+                "@category_name NVARCHAR(100)",
+                (cache_key,),
             )
             row = cur.fetchone()
-            return row["category_id"] if row else None
+            category_id = row["category_id"] if row else None
+            _category_id_cache.set(cache_key, category_id)
+            return category_id
 
 
-def list_categories() -> list[dict]:
+# Anzahl Zeilen, die pro fetchmany()-Aufruf vom Server abgeholt werden.
+CATEGORY_FETCH_SIZE = 500
+
+
+def iter_categories() -> Iterator[dict]:
     """
-    Listet alle verfügbaren Kategorien auf.
+    Liefert alle verfügbaren Kategorien nacheinander (als Generator).
 
-    Returns:
-        Eine Liste von Dictionaries, wobei jedes Dictionary eine Kategorie repräsentiert.
-        Enthält 'category_id', 'name' und 'type'.
+    Die Zeilen werden blockweise per `fetchmany()` gelesen, damit nie die gesamte
+    Tabelle auf einmal im Speicher liegt und Aufrufer schon mit den ersten Zeilen
+    arbeiten können. Die Verbindung bleibt bis zum Ende der Iteration ausgeliehen.
+
+    Yields:
+        Ein Dictionary pro Kategorie mit 'category_id', 'name' und 'type'.
     """
-    with pymssql.connect(**CONNECT_KW) as conn:
+    with _get_connection(readonly=True) as conn:
         with conn.cursor(as_dict=True) as cur:
+            cur.arraysize = CATEGORY_FETCH_SIZE
             cur.execute(
                 """
                 SELECT category_id, name, [type]
@@ -715,9 +1547,35 @@ def list_categories() -> list[dict]:
                 ORDER BY name
                 """,
             )
-            return (
-                cur.fetchall() or []
-            )  # Gibt eine leere Liste zurück, wenn keine Kategorien gefunden wurden.
+            while True:
+                rows = cur.fetchmany(cur.arraysize)
+                if not rows:
+                    break
+                yield from rows
+
+
+def list_categories() -> list[dict]:
+    """
+    Listet alle verfügbaren Kategorien auf.
+
+    Returns:
+        Eine Liste von Dictionaries, wobei jedes Dictionary eine Kategorie repräsentiert.
+        Enthält 'category_id', 'name' und 'type'.
+    """
+    # Die Tabelle ist klein und ändert sich kaum, die Analyse fragt sie aber für jeden
+    # Beleg ab. Daher wird die Liste zwischengespeichert und füllt dabei gleich den
+    # Cache für get_category_id_by_name() mit.
+    categories = _category_list_cache.get("all")
+    if categories is _TTLCache._MISSING:
+        categories = list(iter_categories())
+        _category_list_cache.set("all", categories)
+        for category in categories:
+            _category_id_cache.set(
+                (category["name"] or "").lower(), category["category_id"]
+            )
+    # Kopien zurückgeben, damit Aufrufer den Cache nicht verändern.
+    # Gibt eine leere Liste zurück, wenn keine Kategorien gefunden wurden.
+    return [dict(category) for category in categories]
 
 
 def update_receipt_issuer(
@@ -738,32 +1596,16 @@ def update_receipt_issuer(
         receipt_id: Die ID des zu aktualisierenden Belegs.
         issuer_...: Die neuen Daten des Ausstellers.
     """
-    with pymssql.connect(**CONNECT_KW) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE app.receipts
-                SET issuer_name=%s,
-                    issuer_street=%s,
-                    issuer_city=%s,
-                    issuer_postal_code=%s,
-                    issuer_country=%s,
-                    issuer_latitude=%s,
-                    issuer_longitude=%s
-                WHERE receipt_id=%s
-                """,
-                (
-                    issuer_name,
-                    issuer_street,
-                    issuer_city,
-                    issuer_postal_code,
-                    issuer_country,
-                    issuer_latitude,
-                    issuer_longitude,
-                    receipt_id,
-                ),
-            )
-            conn.commit()
+    update_receipt_processed(
+        receipt_id,
+        issuer_name=issuer_name,
+        issuer_street=issuer_street,
+        issuer_city=issuer_city,
+        issuer_postal_code=issuer_postal_code,
+        issuer_country=issuer_country,
+        issuer_latitude=issuer_latitude,
+        issuer_longitude=issuer_longitude,
+    )
 
 
 def insert_transaction_record(
@@ -793,31 +1635,119 @@ def insert_transaction_record(
     Returns:
         Ein Dictionary mit der ID der neuen Transaktion und dem Erstellungszeitpunkt.
     """
-    with pymssql.connect(**CONNECT_KW) as conn:
+    return insert_transaction_records(
+        [
+            {
+                "account_id": account_id,
+                "amount": amount,
+                "category_id": category_id,
+                "description": description,
+                "txn_date": txn_date,
+                "txn_type": txn_type,
+                "currency": currency,
+                "receipt_id": receipt_id,
+            }
+        ]
+    )[0]
+
+
+# SQL Server erlaubt max. 2100 Parameter pro Statement; bei 9 Parametern pro Zeile
+# bleiben wir mit 200 Zeilen pro Batch sicher darunter.
+TRANSACTION_BATCH_SIZE = 200
+
+
+def insert_transaction_records(rows: list[dict]) -> list[dict]:
+    """
+    Fügt mehrere Transaktionen mit möglichst wenigen Round-Trips ein.
+
+    Statt einer INSERT-Anweisung pro Zeile werden bis zu `TRANSACTION_BATCH_SIZE`
+    Zeilen in einem einzigen Statement gesendet. Alle Zeilen werden gemeinsam
+    committet (alles oder nichts).
+
+    Args:
+        rows: Liste von Dictionaries mit denselben Schlüsseln wie die Argumente von
+            `insert_transaction_record` ('account_id', 'amount', 'category_id',
+            'description', 'txn_date', 'txn_type' sowie optional 'currency' und
+            'receipt_id').
+
+    Returns:
+        Pro Eingabezeile (in derselben Reihenfolge) ein Dictionary mit
+        'transaction_id' und 'created_at'.
+    """
+    if not rows:
+        return []
+
+    results: list[dict | None] = [None] * len(rows)
+    with _get_connection() as conn:
         with conn.cursor(as_dict=True) as cur:
-            cur.execute(
-                """
-                INSERT INTO app.transactions (
-                    account_id, amount, category_id, receipt_id,
-                    [description], [date], [type], currency
+            for offset in range(0, len(rows), TRANSACTION_BATCH_SIZE):
+                chunk = rows[offset : offset + TRANSACTION_BATCH_SIZE]
+                values_sql = ",\n".join(
+                    ["(%s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(chunk)
+                )
+                params: list = []
+                for index, row in enumerate(chunk, start=offset):
+                    params.extend(
+                        (
+                            index,
+                            row["account_id"],
+                            row["amount"],
+                            row.get("category_id"),
+                            row.get("receipt_id"),
+                            row["description"],
+                            row["txn_date"],
+                            row["txn_type"],
+                            row.get("currency") or "CHF",
+                        )
+                    )
+                # MERGE statt INSERT, weil nur MERGE in der OUTPUT-Klausel auf die
+                # Quellspalte (row_index) zugreifen kann. So lassen sich die neuen IDs
+                # zuverlässig den Eingabezeilen zuordnen.
+                cur.execute(
+                    f"""
+                    SET NOCOUNT ON;
+                    DECLARE @inserted TABLE (
+                        row_index INT, transaction_id BIGINT, created_at DATETIME2
+                    );
+
+                    MERGE INTO app.transactions AS target
+                    USING (VALUES
+                        {values_sql}
+                    ) AS source (
+                        row_index, account_id, amount, category_id, receipt_id,
+                        [description], [date], [type], currency
+                    )
+                    ON 1 = 0
+                    WHEN NOT MATCHED THEN
+                        INSERT (
+                            account_id, amount, category_id, receipt_id,
+                            [description], [date], [type], currency
+                        )
+                        VALUES (
+                            source.account_id, source.amount, source.category_id,
+                            source.receipt_id, source.[description], source.[date],
+                            source.[type], source.currency
+                        )
+                    OUTPUT source.row_index, INSERTED.transaction_id, INSERTED.created_at
+                    INTO @inserted;
+
+                    SELECT row_index, transaction_id, created_at FROM @inserted;
+                    """,
+                    tuple(params),
+                )
+                for out in cur.fetchall():
+                    results[out["row_index"]] = {
+                        "transaction_id": out["transaction_id"],
+                        "created_at": _iso(out["created_at"]),
+                    }
+            if any(result is None for result in results):
+                raise RuntimeError(
+                    "Nicht alle Transaktionen konnten gespeichert werden."
                 )
-                OUTPUT INSERTED.transaction_id, INSERTED.created_at
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    account_id,
-                    amount,
-                    category_id,
-                    receipt_id,
-                    description,
-                    txn_date,
-                    txn_type,
-                    currency,
-                ),
-            )
-            row = cur.fetchone()
             conn.commit()
-            return {
-                "transaction_id": row["transaction_id"],
-                "created_at": row["created_at"].isoformat(),
-            }
+
+    for row in rows:
+        if row.get("receipt_id") is not None:
+            _receipt_detail_cache.invalidate(row["receipt_id"])
+
+    return results  # type: ignore[return-value]
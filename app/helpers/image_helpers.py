@@ -5,7 +5,9 @@ from __future__ import annotations
 from io import BytesIO
 from typing import Tuple
 
-from PIL import Image
+from PIL import Image, ImageOps
+
+from app.helpers.receipt_helpers import is_probably_heif
 
 try:  # Pillow >= 9
     _RESAMPLING = Image.Resampling.LANCZOS
@@ -19,24 +21,8 @@ try:  # pragma: no cover - import side effect only
 except Exception:  # pragma: no cover - gracefully degrade if optional dep missing
     pillow_heif = None  # type: ignore
 
-_HEIF_BRANDS = {
-    b"heic",
-    b"heix",
-    b"hevc",
-    b"hevx",
-    b"mif1",
-    b"msf1",
-    b"heif",
-}
-
-
-def _is_probably_heif(payload: bytes) -> bool:
-    """Erkennt HEIC/HEIF-Container grob anhand des ftyp-Headers."""
-    return (
-        len(payload) > 12
-        and payload[4:8] == b"ftyp"
-        and payload[8:12].lower() in _HEIF_BRANDS
-    )
+# JPEG und PNG (der Normalfall bei Uploads) brauchen keine Konvertierung
+_WEB_SAFE_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n")
 
 
 def _resize_if_needed(image: Image.Image, max_edge: int = 3200) -> Image.Image:
@@ -58,7 +44,9 @@ def normalize_upload_image(data: bytes) -> Tuple[bytes, str | None]:
     und weiterverarbeiten lassen. Zurückgegeben werden die (ggf. konvertierten) Bytes sowie
     der ermittelte MIME-Typ (`None`, falls unverändert).
     """
-    if _is_probably_heif(data):
+    if data.startswith(_WEB_SAFE_SIGNATURES):
+        return data, None
+    if is_probably_heif(data):
         if pillow_heif is None:
             raise ValueError(
                 "HEIC/HEIF-Unterstützung ist nicht verfügbar. Bitte installiere 'pillow-heif'."
@@ -67,6 +55,35 @@ def normalize_upload_image(data: bytes) -> Tuple[bytes, str | None]:
             prepared = _resize_if_needed(src)
             rgb_image = prepared.convert("RGB")
             buffer = BytesIO()
-            rgb_image.save(buffer, format="JPEG", quality=90, optimize=True)
+            # Ohne optimize=True: der zweite Huffman-Durchlauf kostet etwa das Dreifache
+            # an Encode-Zeit für nur rund 8 % kleinere Dateien.
+            rgb_image.save(buffer, format="JPEG", quality=90)
             return buffer.getvalue(), "image/jpeg"
     return data, None
+
+
+# Vorschaubilder für die Belegkarten (Karten sind höchstens 320 px breit)
+THUMBNAIL_SIZE = (320, 240)
+
+
+def make_thumbnail(data: bytes | bytearray, size: Tuple[int, int] = THUMBNAIL_SIZE) -> bytes:
+    """
+    Erzeugt ein kleines JPEG-Vorschaubild (Seitenverhältnis bleibt erhalten).
+
+    Raises:
+        OSError: Wenn Pillow die Daten nicht als Bild erkennt (z.B. PDF) oder das Bild
+            mehr Pixel hat, als Pillow als Schutz vor Dekompressionsbomben zulässt.
+    """
+    try:
+        with Image.open(BytesIO(data)) as src:
+            # JPEGs dekodiert libjpeg so direkt in reduzierter Auflösung (1/2 bis 1/8).
+            src.draft("RGB", size)
+            # Handyfotos liegen oft quer im Sensorformat und tragen die Drehung nur im EXIF-Tag
+            ImageOps.exif_transpose(src, in_place=True)
+            src.thumbnail(size, _RESAMPLING)
+            buffer = BytesIO()
+            src.convert("RGB").save(buffer, format="JPEG", quality=75, progressive=True)
+            return buffer.getvalue()
+    except Image.DecompressionBombError as exc:
+        # Erbt nicht von OSError; Aufrufer sollen beide Fälle gleich behandeln können.
+        raise OSError(str(exc)) from exc
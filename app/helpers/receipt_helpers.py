@@ -2,44 +2,75 @@
 
 from __future__ import annotations
 
-import base64
 from datetime import datetime
-from io import BytesIO
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any
 
-from PIL import Image
-
-# Diese Mapping-Tabellen werden von mehreren Seiten genutzt, daher ziehen wir sie in ein eigenes Modul.
-IMAGE_MIME_MAP = {
-    "JPEG": "image/jpeg",
-    "PNG": "image/png",
-    "GIF": "image/gif",
-    "BMP": "image/bmp",
-    "TIFF": "image/tiff",
-    "WEBP": "image/webp",
-    "HEIF": "image/heif",
-    "HEIC": "image/heic",
+# Dateisignaturen (Magic Bytes) der gängigen Bildformate, nach Präfix-Länge gruppiert:
+# pro Länge genügt ein einziger Dict-Zugriff auf den Dateianfang.
+_MAGIC_MIME = {
+    4: {
+        b"\x89PNG": "image/png",
+        b"GIF8": "image/gif",
+        b"II*\x00": "image/tiff",
+        b"MM\x00*": "image/tiff",
+    },
+    3: {b"\xff\xd8\xff": "image/jpeg"},
+    2: {b"BM": "image/bmp"},
 }
 
-STATUS_STYLE_MAP = {
+# Marken im ftyp-Header von HEIC/HEIF-Containern (iPhone-Fotos)
+_HEIF_BRANDS = frozenset({
+    b"heic",
+    b"heix",
+    b"hevc",
+    b"hevx",
+    b"mif1",
+    b"msf1",
+    b"heif",
+})
+
+# Diese Mapping-Tabellen werden von mehreren Seiten genutzt, daher ziehen wir sie in ein eigenes Modul.
+# Die Style-Tabellen sind schreibgeschützt (MappingProxyType) und können so gefahrlos
+# von allen Seiten und Threads gemeinsam genutzt werden.
+STATUS_STYLE_MAP = MappingProxyType({
     "pending": {"label": "Ausstehend", "classes": "bg-amber-100 text-amber-700"},
     "processed": {"label": "Bestätigt", "classes": "bg-emerald-100 text-emerald-600"},
     "error": {"label": "Fehler", "classes": "bg-red-100 text-red-600"},
-}
+})
 DEFAULT_STATUS_STYLE = {"label": "Unbekannt", "classes": "bg-grey-200 text-grey-600"}
 
-CATEGORY_STYLE_MAP = {
+CATEGORY_STYLE_MAP = MappingProxyType({
     "Restaurant": "bg-blue-100 text-blue-700",
     "Lebensmittel": "bg-emerald-100 text-emerald-600",
     "Transport": "bg-amber-100 text-amber-700",
     "Kleidung": "bg-purple-100 text-purple-600",
-}
+})
 DEFAULT_CATEGORY_STYLE = "bg-grey-200 text-grey-700"
 STATUS_BADGE_BASE = "text-caption font-medium px-3 py-1 rounded-full"
 CATEGORY_BADGE_BASE = "text-caption font-medium px-3 py-1 rounded-full"
 
-_PLACEHOLDER_SVG = """
-<svg xmlns='http://www.w3.org/2000/svg' width='400' height='300' viewBox='0 0 400 300'>
+# Fertig zusammengesetzte Badge-Klassen, damit beim Rendern pro Karte kein String gebaut wird.
+STATUS_BADGE_CLASSES = MappingProxyType({
+    key: f"{STATUS_BADGE_BASE} {style['classes']}" for key, style in STATUS_STYLE_MAP.items()
+})
+DEFAULT_STATUS_BADGE_CLASSES = f"{STATUS_BADGE_BASE} {DEFAULT_STATUS_STYLE['classes']}"
+CATEGORY_BADGE_CLASSES = MappingProxyType({
+    name: f"{CATEGORY_BADGE_BASE} {classes}" for name, classes in CATEGORY_STYLE_MAP.items()
+})
+DEFAULT_CATEGORY_BADGE_CLASSES = f"{CATEGORY_BADGE_BASE} {DEFAULT_CATEGORY_STYLE}"
+
+# (Label, Badge-Klassen) pro Status, für `label, classes = _resolve_status(...)`
+_STATUS_BADGES = MappingProxyType({
+    key: (style["label"], STATUS_BADGE_CLASSES[key]) for key, style in STATUS_STYLE_MAP.items()
+})
+_DEFAULT_STATUS_BADGE = (DEFAULT_STATUS_STYLE["label"], DEFAULT_STATUS_BADGE_CLASSES)
+
+# Platzhalter-Grafik (400x300 SVG: heller Verlauf mit angedeutetem Beleg). Sie wird unter
+# PLACEHOLDER_IMAGE_URL mit langer Cache-Dauer ausgeliefert, damit der Browser sie einmal
+# lädt statt sie als Data-URL mit jeder Karte über den Websocket zu bekommen.
+PLACEHOLDER_SVG = """<svg xmlns='http://www.w3.org/2000/svg' width='400' height='300' viewBox='0 0 400 300'>
   <defs>
     <linearGradient id='grad' x1='0%' y1='0%' x2='100%' y2='100%'>
       <stop offset='0%' stop-color='#f4f6fb'/>
@@ -53,30 +84,52 @@ _PLACEHOLDER_SVG = """
     <circle cx='200' cy='140' r='12' opacity='0.4'/>
     <rect x='175' y='170' width='50' height='12' rx='6' opacity='0.35'/>
   </g>
-</svg>
-""".strip()
+</svg>"""
+PLACEHOLDER_IMAGE_URL = "/static/placeholder.svg"
 
-PLACEHOLDER_IMAGE_DATA_URL = (
-    "data:image/svg+xml;base64," + base64.b64encode(_PLACEHOLDER_SVG.encode("utf-8")).decode("ascii")
-)
+
+def is_probably_heif(payload: bytes | bytearray) -> bool:
+    """Erkennt HEIC/HEIF-Container grob anhand des ftyp-Headers (ohne Pillow)."""
+    return (
+        len(payload) > 12
+        and payload[4:8] == b"ftyp"
+        and bytes(payload[8:12]).lower() in _HEIF_BRANDS
+    )
 
 
 def _guess_image_media_type(image_bytes: bytes | None) -> str:
     """Bestimmt den MIME-Typ eines Bildes anhand der Bytes und liefert einen sinnvollen Standard."""
     if not image_bytes:
         return "application/octet-stream"
-    try:
-        with Image.open(BytesIO(image_bytes)) as img:
-            fmt = (img.format or "").upper()
-    except Exception:
-        fmt = ""
-    return IMAGE_MIME_MAP.get(fmt, "image/jpeg")
+    # Nur die Dateisignatur prüfen: Pillow (Plugin-Import, Header-Parsing) wird dafür
+    # nicht gebraucht. Unbekanntes gilt wie bisher als JPEG.
+    for length, table in _MAGIC_MIME.items():
+        mime = table.get(bytes(image_bytes[:length]))
+        if mime:
+            return mime
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    if is_probably_heif(image_bytes):
+        return "image/heif"
+    return "image/jpeg"
+
+
+def _resolve_status(status_name: str | None) -> tuple[str, str]:
+    """Liefert Anzeigetext und fertige Badge-Klassen zu einem Statusnamen aus der DB."""
+    return _STATUS_BADGES.get((status_name or "").lower(), _DEFAULT_STATUS_BADGE)
 
 
 def _format_date(date_value: str | None) -> str:
     """Formatiert ISO-Daten in ein deutschsprachiges Datum (z.B. '30. Sept. 2024')."""
     if not date_value:
         return "-"
+    return _format_iso_date(date_value)
+
+
+# Dieselben Datumswerte kommen bei jedem Neuaufbau der Belegliste wieder vor.
+@lru_cache(maxsize=4096)
+def _format_iso_date(date_value: str) -> str:
+    """Gecachter Kern von `_format_date` (nur für nicht-leere Strings)."""
     try:
         parsed = datetime.fromisoformat(date_value)
         return parsed.strftime("%d. %b %Y")
@@ -91,12 +144,3 @@ def _format_amount(amount: float | None, currency: str | None = None) -> str:
     currency_code = (currency or "CHF").upper()
     formatted = f"{amount:,.2f}".replace(",", "'")
     return f"{currency_code} {formatted}"
-
-
-def _image_to_data_url(image_bytes: bytes | None) -> str | None:
-    """Wandelt Rohbytes eines Bildes in eine base64-Data-URL um."""
-    if not image_bytes:
-        return None
-    encoded = base64.b64encode(image_bytes).decode("ascii")
-    mime = _guess_image_media_type(image_bytes)
-    return f"data:{mime};base64,{encoded}"
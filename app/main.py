@@ -6,21 +6,40 @@ Diese Datei ist der Haupteinstiegspunkt der Anwendung.
 Sie verwendet das FastAPI-Framework für die API-Endpunkte und NiceGUI für die Benutzeroberfläche.
 """
 
-import asyncio
+import logging
 import os
 
 import uvicorn
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import Response
+from fastapi import FastAPI, File, Form, Header, HTTPException, UploadFile
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
 from nicegui import storage as ng_storage, ui
+from starlette.datastructures import Headers
 
-from app.db import delete_receipt, load_receipt_image
+from app.db import (
+    RECEIPT_IMAGE_SIGNATURE_LENGTH,
+    delete_receipt,
+    fetch_db_heartbeat,
+    get_cached_receipt_image,
+    iter_receipt_image,
+    run_db,
+)
 from app.helpers.auth_helpers import _ensure_authenticated  # noqa: F401  # Für spätere Programmlogik verfügbar halten
-from app.helpers.receipt_helpers import _guess_image_media_type
+from app.helpers.receipt_helpers import (
+    PLACEHOLDER_IMAGE_URL,
+    PLACEHOLDER_SVG,
+    _guess_image_media_type,
+)
 from app.receipt_analysis import analyze_receipt
-from app.services.receipt_upload_service import process_receipt_upload
+from app.services.receipt_thumbnail_service import load_receipt_thumbnail
+from app.services.receipt_upload_service import (
+    MAX_UPLOAD_BYTES,
+    PayloadTooLarge,
+    upload_and_analyze_receipt,
+)
 from app.ui_layout import nav  # noqa: F401  # Wird von den ausgelagerten Seiten genutzt
 
+logger = logging.getLogger(__name__)
+
 # 1. Erstellen der FastAPI-App
 # Dies ist die Hauptanwendung, die von einem ASGI-Server wie uvicorn ausgeführt wird.
 app = FastAPI(title="Smart Expense Tracker")
@@ -28,20 +47,72 @@ app = FastAPI(title="Smart Expense Tracker")
 # NiceGUI-Storage aktivieren (für Benutzerzustand über Seitenwechsel hinweg)
 ng_storage.set_storage_secret(os.getenv("NICEGUI_STORAGE_SECRET", "smart-expense-secret"))
 
+# Spielraum für Multipart-Grenzen und das Formularfeld user_id neben der eigentlichen Datei.
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+
+class RejectOversizedUploads:
+    """Weist zu grosse Uploads anhand von Content-Length ab, bevor der Body gelesen wird.
+
+    FastAPI parst das Multipart-Formular noch vor dem Endpunkt (und vor Dependencies);
+    ohne diese Prüfung würde eine 1-GB-Anfrage erst komplett übertragen und
+    zwischengespeichert. Als reine ASGI-Middleware kostet sie allen anderen Anfragen
+    nur einen Pfadvergleich.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["path"] == "/api/upload"
+            and scope["method"] == "POST"
+        ):
+            try:
+                content_length = int(Headers(scope=scope).get("content-length", "0"))
+            except ValueError:
+                content_length = 0
+            if content_length > MAX_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD:
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": "Die Datei ist zu groß (maximal 50 MB)."},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(RejectOversizedUploads)
+
+
+@app.get("/health")
+async def health():
+    """Leichter Readiness-Check für Monitoring und Load-Balancer (prüft auch die Datenbank)."""
+    try:
+        database = await run_db(fetch_db_heartbeat)
+    except Exception as e:
+        # Die Fehlermeldung (Servername, Login) gehört ins Log, nicht in die öffentliche Antwort.
+        logger.exception("Health-Check: Datenbank nicht erreichbar")
+        raise HTTPException(status_code=503, detail="Datenbank nicht erreichbar") from e
+    return {"status": "ok", "database": database}
+
+
 @app.post("/api/upload")
 async def api_upload(file: UploadFile = File(...), user_id: int = Form(...)):
     """
     Nimmt eine Datei per REST-API entgegen, speichert sie und startet die Analyse.
     Dieser Endpunkt kann von anderen Programmen oder über die API-Dokumentation (Swagger) genutzt werden.
     """
+    # Starlette hat die Datei bereits (ab 1 MB auf Disk) zwischengespeichert und kennt ihre
+    # Grösse; zu grosse Dateien werden abgewiesen, bevor sie komplett im RAM landen.
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Die Datei ist zu groß (maximal 50 MB).")
     try:
         content = await file.read()
-        result = await asyncio.to_thread(
-            process_receipt_upload, user_id, content, file.filename
-        )
-        analysis = await analyze_receipt(result["receipt_id"], user_id)
-        result["analysis"] = analysis
-        return result
+        return await upload_and_analyze_receipt(user_id, content, file.filename)
+    except PayloadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -62,29 +133,148 @@ async def api_analyze_receipt(receipt_id: int, user_id: int | None = None):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _parse_byte_range(value: str | None) -> tuple[int, int | None] | None:
+    """Liest einen einfachen Range-Header ('bytes=START-' oder 'bytes=START-END').
+
+    Andere Formen (mehrere Bereiche, Suffix 'bytes=-N') werden ignoriert; dann wird
+    wie ohne Range das ganze Bild ausgeliefert.
+    """
+    if not value or not value.startswith("bytes=") or "," in value:
+        return None
+    first, _, last = value[6:].strip().partition("-")
+    if not first.isdigit() or (last and not last.isdigit()):
+        return None
+    start, end = int(first), int(last) if last else None
+    if end is not None and end < start:
+        return None
+    return start, end
+
+
 @app.get("/api/receipts/{receipt_id}/image")
-async def api_receipt_image(receipt_id: int):
-    """Gibt das gespeicherte Belegbild als HTTP-Response zurück."""
+async def api_receipt_image(
+    receipt_id: int,
+    if_none_match: str | None = Header(default=None),
+    range_header: str | None = Header(default=None, alias="Range"),
+):
+    """Gibt das gespeicherte Belegbild als gestreamte HTTP-Response zurück (inkl. Range)."""
+    # Belegbilder ändern sich nach dem Upload nie, Receipt-IDs werden nicht wiederverwendet:
+    # der Browser darf das Bild also zwischenspeichern und muss es nicht erneut laden.
+    # Die ID genügt deshalb als ETag, ohne die Bilddaten zu hashen.
+    etag = f'"receipt-{receipt_id}"'
+    headers = {
+        "Cache-Control": "private, max-age=86400, immutable",
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+    }
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = _parse_byte_range(range_header)
+    start, end = byte_range or (0, None)
+
+    # Bilder aus dem Cache gehen ohne Thread-Wechsel und Blockkopien in einem Stück raus.
+    cached = get_cached_receipt_image(receipt_id)
+    if cached is not None:
+        media_type = _guess_image_media_type(cached[:RECEIPT_IMAGE_SIGNATURE_LENGTH])
+        if byte_range is None:
+            return Response(content=cached, media_type=media_type, headers=headers)
+        size = len(cached)
+        if start >= size:
+            return _range_not_satisfiable(size, headers)
+        stop = size if end is None else min(end + 1, size)
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+        return Response(
+            content=memoryview(cached)[start:stop],
+            status_code=206,
+            media_type=media_type,
+            headers=headers,
+        )
+
+    info: dict = {}
+    chunks = iter_receipt_image(receipt_id, start=start, end=end, info=info)
+    # Den ersten Block vorab lesen: so wird ein fehlender Beleg noch als 404 gemeldet,
+    # die Gesamtgrösse ist bekannt und der MIME-Typ lässt sich aus dem Dateikopf bestimmen.
     try:
-        record = await asyncio.to_thread(load_receipt_image, receipt_id)
+        first_chunk = await run_db(next, chunks, b"")
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
-    image_bytes = record.get("receipt_image")
-    if not image_bytes:
+    size = info.get("size") or 0
+    if not first_chunk:
+        chunks.close()
+        if size and byte_range is not None:
+            return _range_not_satisfiable(size, headers)
         raise HTTPException(
             status_code=404, detail="Kein Bild für diesen Beleg gespeichert."
         )
 
-    media_type = _guess_image_media_type(image_bytes)
-    return Response(content=image_bytes, media_type=media_type)
+    async def _body():
+        # Jeder weitere Block wird ebenfalls über den DB-Executor gelesen, nicht im
+        # Threadpool von Starlette, der sonst synchron über den Generator iteriert.
+        chunk = first_chunk
+        try:
+            while chunk:
+                yield chunk
+                chunk = await run_db(next, chunks, b"")
+        finally:
+            chunks.close()
+
+    stop = size if end is None else min(end + 1, size)
+    headers["Content-Length"] = str(stop - start)
+    status_code = 200
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+        status_code = 206
+    # Der Dateikopf kommt mit dem ersten Block, auch wenn der Bereich mitten im Bild beginnt.
+    media_type = _guess_image_media_type(info.get("signature"))
+    return StreamingResponse(
+        _body(), status_code=status_code, media_type=media_type, headers=headers
+    )
+
+
+def _range_not_satisfiable(size: int, headers: dict) -> Response:
+    """Antwort für Range-Anfragen, die hinter dem Bildende beginnen."""
+    return Response(
+        status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"}
+    )
+
+
+@app.get("/api/receipts/{receipt_id}/thumb")
+async def api_receipt_thumbnail(
+    receipt_id: int, if_none_match: str | None = Header(default=None)
+):
+    """Gibt ein verkleinertes JPEG (max. 320x240) des Belegbilds für die Belegkarten zurück."""
+    # Wie beim Originalbild: Inhalt ändert sich nie, die ID genügt als ETag.
+    etag = f'"receipt-thumb-{receipt_id}"'
+    headers = {"Cache-Control": "private, max-age=86400, immutable", "ETag": etag}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        thumbnail = await load_receipt_thumbnail(receipt_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except OSError:
+        # Nicht dekodierbare Formate (z.B. PDF) liefert weiterhin der Original-Endpunkt.
+        return RedirectResponse(f"/api/receipts/{receipt_id}/image")
+    return Response(content=thumbnail, media_type="image/jpeg", headers=headers)
+
+
+@app.get(PLACEHOLDER_IMAGE_URL)
+async def placeholder_image():
+    """Liefert die Platzhalter-Grafik für Belege ohne Bild (vom Browser dauerhaft gecacht)."""
+    return Response(
+        content=PLACEHOLDER_SVG,
+        media_type="image/svg+xml",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
 
 
 @app.delete("/api/receipts/{receipt_id}")
 async def api_delete_receipt(receipt_id: int, user_id: int | None = None):
     """Löscht einen bestehenden Beleg endgültig."""
     try:
-        await asyncio.to_thread(delete_receipt, receipt_id, user_id=user_id)
+        await run_db(delete_receipt, receipt_id, user_id=user_id)
     except ValueError as exc:
         message = str(exc)
         status = 404 if "nicht gefunden" in message.lower() else 400
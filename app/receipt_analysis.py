@@ -9,13 +9,13 @@ import json
 import os
 from datetime import datetime, date
 from decimal import Decimal
-from io import BytesIO
 from typing import Any, Dict, Optional, Tuple, List
 
 from geopy import geocoders
 from geopy.exc import GeocoderServiceError, GeocoderTimedOut
 from google.genai import Client, types
-from PIL import Image, UnidentifiedImageError
+
+from app.helpers.receipt_helpers import _guess_image_media_type
 
 # Importiert Datenbank-Funktionen aus einer anderen Datei im Projekt.
 from app.db import (
@@ -25,7 +25,7 @@ from app.db import (
     list_categories,
     load_receipt_image,
     mark_receipt_status,
-    update_receipt_issuer,
+    update_receipt_processed,
 )
 
 # Dies ist die Anweisung für das KI-Modell.
@@ -169,11 +169,17 @@ class ReceiptAnalyzer:
             receipt_id=receipt_id,
         )
 
-        # Ausstellerinformationen aktualisieren (inkl. Geocoding)
-        issuer_payload = self._update_issuer_info(receipt_id, parsed_data)
+        # Ausstellerinformationen ermitteln (inkl. Geocoding)
+        issuer_payload = self._build_issuer_info(parsed_data)
 
-        # Status des Belegs auf "verarbeitet" setzen
-        mark_receipt_status(receipt_id, status_id=2, extracted_text=raw_response)
+        # Status "verarbeitet" und Aussteller in einem UPDATE speichern
+        update_receipt_processed(
+            receipt_id,
+            status_id=2,
+            extracted_text=raw_response,
+            error_message=None,
+            **issuer_payload,
+        )
 
         return {
             "status": "processed",
@@ -182,17 +188,13 @@ class ReceiptAnalyzer:
             "issuer": issuer_payload,
         }
 
-    def _update_issuer_info(
-        self, receipt_id: int, parsed_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Extrahiert Ausstellerinfos, findet Koordinaten und speichert sie."""
+    def _build_issuer_info(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extrahiert Ausstellerinfos und ergänzt die Koordinaten."""
         issuer_payload = self._extract_issuer_fields(parsed_data)
         lat, lon = self._geocode_latlon(issuer_payload)
 
         issuer_payload["issuer_latitude"] = lat
         issuer_payload["issuer_longitude"] = lon
-
-        update_receipt_issuer(receipt_id, **issuer_payload)
         return issuer_payload
 
     def _handle_error(
@@ -299,14 +301,8 @@ class ReceiptAnalyzer:
     def _guess_media_type(data: bytes) -> str:
         """Bestimmt den Medientyp (z.B. 'image/jpeg') des Bildes."""
         # Dies ist wichtig, damit das KI-Modell weiß, wie es die Daten interpretieren soll.
-        try:
-            with Image.open(BytesIO(data)) as img:
-                fmt = (img.format or "").strip().lower()
-        except (UnidentifiedImageError, OSError):
-            fmt = None
-        if fmt == "jpg":
-            fmt = "jpeg"
-        return f"image/{fmt}" if fmt else "image/jpeg"
+        # Die Erkennung läuft über die Dateisignatur, ohne das Bild mit Pillow zu öffnen.
+        return _guess_image_media_type(data)
 
     @staticmethod
     def _parse_response(text: str) -> Dict[str, Any]:
@@ -0,0 +1,50 @@
+"""Erzeugt und cacht die Vorschaubilder der Belegkarten."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.db import (
+    cache_receipt_thumbnail,
+    get_cached_receipt_thumbnail,
+    load_receipt_image,
+    run_db,
+)
+from app.helpers.image_helpers import make_thumbnail
+
+# Eigene Worker für das Verkleinern (Pillow, CPU-lastig): viele neue Karten auf einmal
+# belegen so weder den DB-Executor noch die Threads des Standard-Executors.
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+_thumbnail_executor = ThreadPoolExecutor(
+    max_workers=max(1, THUMBNAIL_WORKERS), thread_name_prefix="thumbnail"
+)
+
+
+async def load_receipt_thumbnail(receipt_id: int) -> bytes:
+    """
+    Liefert ein JPEG-Vorschaubild (max. 320x240) zu einem Beleg.
+
+    Beim ersten Aufruf wird das Originalbild über den DB-Executor geladen und auf
+    `_thumbnail_executor` verkleinert, danach kommt das Vorschaubild aus dem
+    In-Memory-Cache. Das Original landet dabei nicht im Bild-Cache: beim Öffnen der
+    Kartenübersicht würde es sonst die Bilder der Detailansicht verdrängen.
+
+    Raises:
+        ValueError: Wenn der Beleg nicht existiert oder kein Bild hat.
+        OSError: Wenn das gespeicherte Bild nicht dekodiert werden kann (auch bei
+            Bildern über Pillows Pixel-Grenze).
+    """
+    cached = get_cached_receipt_thumbnail(receipt_id)
+    if cached is not None:
+        return cached
+
+    row = await run_db(load_receipt_image, receipt_id, populate_cache=False)
+    image = row["receipt_image"]
+    if not image:
+        raise ValueError("Kein Bild für diesen Beleg gespeichert.")
+    loop = asyncio.get_running_loop()
+    thumbnail = await loop.run_in_executor(_thumbnail_executor, make_thumbnail, image)
+    cache_receipt_thumbnail(receipt_id, row["user_id"], thumbnail)
+    return thumbnail
@@ -2,10 +2,30 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
 from app.db import insert_receipt
 from app.helpers.image_helpers import normalize_upload_image
+from app.receipt_analysis import analyze_receipt
 
 MAX_BYTES = 20 * 1024 * 1024  # 20 MB safety limit after normalization
+# Grenze für die Rohdatei beim Hochladen (Middleware, API-Handler, Upload-Widget). Sie liegt
+# über MAX_BYTES, weil grosse HEIC-Fotos nach dem Verkleinern/Konvertieren noch darunter fallen.
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+# Eigene Worker für Uploads (Bildkonvertierung + BLOB-Insert): ein Schwall grosser Uploads
+# belegt so nicht die Threads des Standard-Executors, die andere Handler brauchen.
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
+_upload_executor = ThreadPoolExecutor(
+    max_workers=max(1, UPLOAD_WORKERS), thread_name_prefix="upload"
+)
+
+
+class PayloadTooLarge(ValueError):
+    """Die Datei überschreitet `MAX_BYTES` (die API antwortet darauf mit HTTP 413)."""
 
 
 def process_receipt_upload(user_id: int, content: bytes, filename: str | None) -> dict:
@@ -21,22 +41,52 @@ def process_receipt_upload(user_id: int, content: bytes, filename: str | None) -
         dict mit den gespeicherten Metadaten zum Beleg.
 
     Ausnahmen:
-        ValueError: Wenn die Datei leer ist oder das Größenlimit überschreitet.
+        ValueError: Wenn die Datei leer ist.
+        PayloadTooLarge: Wenn die Datei das Größenlimit überschreitet.
     """
     if not content:
         raise ValueError("Die hochgeladene Datei ist leer.")
 
     normalized_content, mime_type = normalize_upload_image(content)
-    if len(normalized_content) > MAX_BYTES:
-        raise ValueError("Die Datei ist zu groß (maximal 20 MB).")
+    size_bytes = len(normalized_content)
+    if size_bytes > MAX_BYTES:
+        raise PayloadTooLarge("Die Datei ist zu groß (maximal 20 MB).")
 
     db_result = insert_receipt(user_id, normalized_content)
     result = {
         "ok": True,
         "filename": filename or "upload.bin",
-        "size_bytes": len(normalized_content),
+        "size_bytes": size_bytes,
     }
     if mime_type:
         result["mime_type"] = mime_type
     result.update(db_result)
     return result
+
+
+async def upload_and_analyze_receipt(
+    user_id: int,
+    content: bytes,
+    filename: str | None,
+    *,
+    on_stored: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Speichert einen Upload und analysiert ihn direkt; gemeinsamer Ablauf für
+    `/api/upload` und die Upload-Seite.
+
+    Parameter:
+        on_stored: Optionaler Callback, sobald der Beleg gespeichert ist und die
+            Analyse beginnt (z.B. für eine Statusanzeige).
+
+    Rückgabe:
+        Ergebnis von `process_receipt_upload`, ergänzt um 'analysis'.
+    """
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        _upload_executor, process_receipt_upload, user_id, content, filename
+    )
+    if on_stored is not None:
+        on_stored(result)
+    result["analysis"] = await analyze_receipt(result["receipt_id"], user_id)
+    return result
@@ -17,18 +17,32 @@ def _current_path() -> str:
         return '/'
 
 
+# Fertige Klassen-Strings der Menüeinträge (aktiv/inaktiv), einmal beim Import gebaut
+_NAV_ITEM_BASE_CLASSES = (
+    'w-full items-center gap-2 px-3 py-2 rounded-xl cursor-pointer '
+    'transition-all'
+)
+_NAV_ITEM_ACTIVE_CLASSES = (
+    f'{_NAV_ITEM_BASE_CLASSES} '
+    'bg-gradient-to-r from-blue-500 to-purple-600 text-white shadow-md'
+)
+_NAV_ITEM_INACTIVE_CLASSES = (
+    f'{_NAV_ITEM_BASE_CLASSES} text-grey-7 hover:bg-indigo-50 hover:text-indigo-700'
+)
+
+# Menüeinträge der Sidebar: (Beschriftung, Icon, Pfad)
+_NAV_ITEMS = (
+    ('Dashboard+', 'insights', '/dashboard/extended'),
+    ('Belege', 'receipt_long', '/receipts'),
+    ('Hochladen', 'upload', '/upload'),
+    ('Einstellungen', 'settings', '/settings'),
+)
+
+
 def _side_nav_item(label: str, icon: str, path: str, active: bool = False) -> None:
     """Rendert einen Menüeintrag in der Sidebar und markiert ihn bei aktiver Seite."""
-    base = (
-        'w-full items-center gap-2 px-3 py-2 rounded-xl cursor-pointer '
-        'transition-all'
-    )
-    active_cls = (
-        'bg-gradient-to-r from-blue-500 to-purple-600 text-white shadow-md'
-    )
-    inactive_cls = 'text-grey-7 hover:bg-indigo-50 hover:text-indigo-700'
-    with ui.row().classes(f'{base} {active_cls if active else inactive_cls}')\
-                 .on('click', lambda: ui.navigate.to(path)):
+    classes = _NAV_ITEM_ACTIVE_CLASSES if active else _NAV_ITEM_INACTIVE_CLASSES
+    with ui.row().classes(classes).on('click', lambda: ui.navigate.to(path)):
         ui.icon(icon).classes('text-[18px]')
         ui.label(label).classes('text-body2 font-medium')
 
@@ -36,7 +50,6 @@ def _side_nav_item(label: str, icon: str, path: str, active: bool = False) -> No
 def nav(user: dict):
     """Stellt die responsive Navigation bereit (Drawer + Burger-Button)."""
     p = _current_path()
-    display_name = user.get("name") or user.get("email") or "Demo-Modus"
 
     with ui.left_drawer(value=False).props('bordered show-if-above').classes(
         'w-64 bg-white/80 backdrop-blur p-4 transition-transform duration-300 ease-in-out md:static md:translate-x-0'
@@ -52,10 +65,8 @@ def nav(user: dict):
 
             ui.separator().classes('q-my-sm')
 
-            _side_nav_item('Dashboard+', 'insights', '/dashboard/extended', active=(p == '/dashboard/extended'))
-            _side_nav_item('Belege', 'receipt_long', '/receipts', active=(p == '/receipts'))
-            _side_nav_item('Hochladen', 'upload', '/upload', active=(p == '/upload'))
-            _side_nav_item('Einstellungen', 'settings', '/settings', active=(p == '/settings'))
+            for label, icon, path in _NAV_ITEMS:
+                _side_nav_item(label, icon, path, active=(p == path))
 
     # Burger-Button: sichtbar bis 1023 px (md & lg hidden), damit Mobile/Tablet Benutzer:innen navigieren können.
     with ui.row().classes(
@@ -5,7 +5,7 @@ from datetime import datetime
 
 from nicegui import ui
 
-from app.db import get_user_settings, list_receipts_overview
+from app.db import get_user_settings, list_receipts_overview, run_db
 from app.helpers.auth_helpers import _ensure_authenticated, _get_user_store
 from app.helpers.receipt_helpers import _format_amount
 from app.ui_layout import get_selected_month, month_bar, nav
@@ -48,6 +48,22 @@ def dashboard_extended_page():
     last_expenses = 0.0
     category_color_map: dict[str, str] = {}
 
+    def _show_echart(chart, container, options: dict, classes: str):
+        """Aktualisiert ein bestehendes Diagramm oder legt es beim ersten Aufruf an.
+
+        Statt den Container bei jeder Aktualisierung zu leeren und ein neues `ui.echart`
+        zu erzeugen, werden nur die Optionen ersetzt; bei unveränderten Daten passiert nichts.
+        """
+        if chart is not None and not chart.is_deleted:
+            if chart.options != options:
+                chart.options.clear()
+                chart.options.update(options)
+                chart.update()
+            return chart
+        container.clear()
+        with container:
+            return ui.echart(options).classes(classes)
+
     def match_month(r, selected):
         """Prüft, ob der Belegzeitpunkt in den aktuell ausgewählten Monat fällt."""
         date_value = r.get('transaction_date') or r.get('upload_date')
@@ -149,9 +165,9 @@ def dashboard_extended_page():
                 {'name': 'Über Budget', 'type': 'bar', 'data': over_series, 'itemStyle': {'color': '#EF4444'}},
             ],
         }
-        budget_chart_container.clear()
-        with budget_chart_container:
-            budget_vs_expense_chart = ui.echart(opts).classes('w-full h-[320px]')
+        budget_vs_expense_chart = _show_echart(
+            budget_vs_expense_chart, budget_chart_container, opts, 'w-full h-[320px]'
+        )
 
     def update_category_chart():
         """Aktualisiert die Donut-Grafik 'Ausgaben nach Kategorie' inkl. Legende."""
@@ -174,21 +190,19 @@ def dashboard_extended_page():
                 color = _get_category_color(k)
                 data.append({'name': k, 'value': round(v, 2)})
                 colors_for_data.append(color)
-            chart_container.clear()
-            with chart_container:
-                category_chart = ui.echart({
-                    'tooltip': {'trigger': 'item', 'formatter': '{b}: {c} ({d}%)'},
-                    'series': [{
-                        'type': 'pie',
-                        'radius': ['45%', '70%'],
-                        'avoidLabelOverlap': True,
-                        'itemStyle': {'borderColor': '#fff', 'borderWidth': 2},
-                        'label': {'show': False},
-                        'labelLine': {'show': False},
-                        'data': data,
-                        'color': colors_for_data,
-                    }],
-                }).classes('w-[320px] h-[240px]')
+            category_chart = _show_echart(category_chart, chart_container, {
+                'tooltip': {'trigger': 'item', 'formatter': '{b}: {c} ({d}%)'},
+                'series': [{
+                    'type': 'pie',
+                    'radius': ['45%', '70%'],
+                    'avoidLabelOverlap': True,
+                    'itemStyle': {'borderColor': '#fff', 'borderWidth': 2},
+                    'label': {'show': False},
+                    'labelLine': {'show': False},
+                    'data': data,
+                    'color': colors_for_data,
+                }],
+            }, 'w-[320px] h-[240px]')
 
             legend_container.clear()
             if not data:
@@ -211,9 +225,9 @@ def dashboard_extended_page():
         nonlocal budget_split_chart, budget_split_container, budget_split_legend
         if budget_split_container is None or budget_split_legend is None:
             return
-        budget_split_container.clear()
         budget_split_legend.clear()
         if not last_effective_budget or last_effective_budget <= 0:
+            budget_split_container.clear()
             with budget_split_container:
                 ui.label('Kein Budget definiert.').classes('text-caption text-grey-6')
             with budget_split_legend:
@@ -233,25 +247,25 @@ def dashboard_extended_page():
             data.append({'name': 'Über Budget', 'value': round(last_expenses - last_effective_budget, 2)})
             colors_for_data.append('#EF4444')
         if not data:
+            budget_split_container.clear()
             with budget_split_container:
                 ui.label('Keine Ausgaben für diesen Monat.').classes('text-caption text-grey-6')
             with budget_split_legend:
                 ui.label('').classes('text-caption text-grey-6')
             return
-        with budget_split_container:
-            budget_split_chart = ui.echart({
-                'tooltip': {'trigger': 'item', 'formatter': '{b}: {c} ({d}%)'},
-                'series': [{
-                    'type': 'pie',
-                    'radius': ['45%', '70%'],
-                    'avoidLabelOverlap': True,
-                    'itemStyle': {'borderColor': '#fff', 'borderWidth': 2},
-                    'label': {'show': False},
-                    'labelLine': {'show': False},
-                    'color': colors_for_data or ['#10B981', '#3B82F6', '#EF4444'],
-                    'data': data,
-                }],
-            }).classes('w-[320px] h-[240px]')
+        budget_split_chart = _show_echart(budget_split_chart, budget_split_container, {
+            'tooltip': {'trigger': 'item', 'formatter': '{b}: {c} ({d}%)'},
+            'series': [{
+                'type': 'pie',
+                'radius': ['45%', '70%'],
+                'avoidLabelOverlap': True,
+                'itemStyle': {'borderColor': '#fff', 'borderWidth': 2},
+                'label': {'show': False},
+                'labelLine': {'show': False},
+                'color': colors_for_data or ['#10B981', '#3B82F6', '#EF4444'],
+                'data': data,
+            }],
+        }, 'w-[320px] h-[240px]')
         with budget_split_legend:
             if not data:
                 ui.label('').classes('text-caption text-grey-6')
@@ -268,8 +282,8 @@ def dashboard_extended_page():
         nonlocal category_trend_chart, category_trend_chart_container
         if category_trend_chart_container is None:
             return
-        category_trend_chart_container.clear()
         if not category_monthly_breakdown:
+            category_trend_chart_container.clear()
             with category_trend_chart_container:
                 ui.label('Keine Verlaufsdaten vorhanden.').classes('text-caption text-grey-6')
             return
@@ -288,17 +302,17 @@ def dashboard_extended_page():
             data = [round(category_monthly_breakdown[month].get(cat, 0.0), 2) for month in month_labels]
             series.append({'name': cat, 'type': 'bar', 'stack': 'Ausgaben', 'data': data, 'itemStyle': {'color': color}})
         if not series:
+            category_trend_chart_container.clear()
             with category_trend_chart_container:
                 ui.label('Keine Kategorien mit Daten vorhanden.').classes('text-caption text-grey-6')
             return
-        with category_trend_chart_container:
-            category_trend_chart = ui.echart({
-                'tooltip': {'trigger': 'axis'},
-                'legend': {'data': categories},
-                'xAxis': {'type': 'category', 'data': month_labels},
-                'yAxis': {'type': 'value'},
-                'series': series,
-            }).classes('w-full h-[320px]')
+        category_trend_chart = _show_echart(category_trend_chart, category_trend_chart_container, {
+            'tooltip': {'trigger': 'axis'},
+            'legend': {'data': categories},
+            'xAxis': {'type': 'category', 'data': month_labels},
+            'yAxis': {'type': 'value'},
+            'series': series,
+        }, 'w-full h-[320px]')
 
     def update_budget_display():
         """Spiegelt das maximale Budget aus dem User-Store im KPI-Kärtchen wider."""
@@ -368,7 +382,7 @@ def dashboard_extended_page():
             return
         budget_sync_running = True
         try:
-            settings = await asyncio.to_thread(get_user_settings, user_id)
+            settings = await run_db(get_user_settings, user_id)
             value = settings.get('max_budget')
         except Exception as exc:
             ui.notify(f'Budget konnte nicht geladen werden: {exc}', color='warning')
@@ -387,7 +401,7 @@ def dashboard_extended_page():
         nonlocal receipts, budget_data, income_data, monthly_summary, category_monthly_breakdown, category_color_map
         try:
             user_id = user.get("user_id") or None
-            receipts = await asyncio.to_thread(list_receipts_overview, user_id)
+            receipts = await run_db(list_receipts_overview, user_id)
             # Derive monthly summary from loaded receipts
             monthly_summary = _compute_monthly_summary(receipts)
             category_monthly_breakdown = _compute_category_monthly_breakdown(receipts)
@@ -2,11 +2,9 @@
 
 from __future__ import annotations
 
-import asyncio
-
 from nicegui import ui
 
-from app.db import authenticate_user, create_user
+from app.db import authenticate_user, create_user, run_db
 from app.helpers.auth_helpers import (
     _get_logged_in_user,
     _set_guest_user,
@@ -38,7 +36,7 @@ def login_page():
             status_label.set_text('Bitte E-Mail und Passwort eingeben.')
             return
         try:
-            user_data = await asyncio.to_thread(authenticate_user, email, password)
+            user_data = await run_db(authenticate_user, email, password)
         except ValueError as exc:
             status_label.set_text(str(exc))
             ui.notify(str(exc), color='warning')
@@ -72,7 +70,7 @@ def login_page():
             return
 
         try:
-            user_data = await asyncio.to_thread(
+            user_data = await run_db(
                 create_user, name or None, email, password
             )
         except ValueError as exc:
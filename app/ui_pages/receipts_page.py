@@ -2,26 +2,25 @@
 
 from __future__ import annotations
 
-import asyncio
-
 from nicegui import ui
 
-from app.db import delete_receipt, get_receipt_detail, list_receipts_overview
+from app.db import delete_receipt, get_receipt_detail, list_receipts_overview, run_db
 from app.helpers.auth_helpers import _ensure_authenticated
 from app.helpers.receipt_helpers import (
-    CATEGORY_BADGE_BASE,
-    CATEGORY_STYLE_MAP,
-    DEFAULT_CATEGORY_STYLE,
-    DEFAULT_STATUS_STYLE,
-    PLACEHOLDER_IMAGE_DATA_URL,
+    CATEGORY_BADGE_CLASSES,
+    DEFAULT_CATEGORY_BADGE_CLASSES,
+    DEFAULT_STATUS_BADGE_CLASSES,
+    PLACEHOLDER_IMAGE_URL,
     STATUS_BADGE_BASE,
-    STATUS_STYLE_MAP,
     _format_amount,
     _format_date,
-    _image_to_data_url,
+    _resolve_status,
 )
 from app.ui_layout import nav
 
+# Anzahl Karten, die pro Schritt aufgebaut werden ("Weitere Belege laden").
+CARDS_PAGE_SIZE = 24
+
 
 @ui.page('/receipts')
 def receipts_page():
@@ -33,6 +32,11 @@ def receipts_page():
 
     receipts: list[dict] = []
     filtered: list[dict] = []
+    rendered_count = 0
+    # Bereits gebaute Karten je Beleg; Filterwechsel blenden sie nur ein oder aus.
+    card_by_id: dict[int, ui.card] = {}
+    shown_ids: set[int] = set()
+    empty_card: ui.card | None = None
     category_options: list[str] = ["Alle Kategorien"]
 
     with ui.column().classes(
@@ -44,7 +48,7 @@ def receipts_page():
             total_count_label = ui.label("0 Belege").classes("text-caption text-grey-6")
 
         search_input = ui.input(label="").props(
-            'dense filled rounded clearable placeholder="Belege suchen..."'
+            'dense filled rounded clearable debounce="150" placeholder="Belege suchen..."'
         )
         search_input.classes("w-full max-w-6xl bg-white/90 shadow-sm")
         with search_input.add_slot("prepend"):
@@ -83,6 +87,10 @@ def receipts_page():
         cards_container = ui.row().classes(
             "w-full max-w-6xl gap-4 flex-wrap justify-start items-stretch"
         )
+        more_button = ui.button(
+            "Weitere Belege laden", on_click=lambda: append_cards()
+        ).classes("bg-white text-grey-7 border border-grey-4 px-6 rounded-full")
+        more_button.set_visibility(False)
 
     detail_dialog = ui.dialog()
     with detail_dialog, ui.card().classes(
@@ -91,7 +99,7 @@ def receipts_page():
         with ui.row().classes("w-full gap-6"):
             with ui.column().classes("w-5/12 gap-3"):
                 ui.label("Beleg-Vorschau").classes("text-body1 font-semibold text-grey-8")
-                detail_image = ui.image(PLACEHOLDER_IMAGE_DATA_URL).classes(
+                detail_image = ui.image(PLACEHOLDER_IMAGE_URL).classes(
                     "w-full h-72 object-cover rounded-xl bg-grey-2"
                 )
                 detail_image.props("fit=cover")
@@ -102,7 +110,7 @@ def receipts_page():
                         "text-body1 font-semibold text-grey-8"
                     )
                     detail_status_badge = ui.label("Unbekannt").classes(
-                        f"{STATUS_BADGE_BASE} bg-grey-200 text-grey-600"
+                        DEFAULT_STATUS_BADGE_CLASSES
                     )
                 detail_info_label = ui.label(" ").classes("text-caption text-primary")
                 with ui.row().classes("gap-3 w-full"):
@@ -166,29 +174,29 @@ def receipts_page():
             category_name = receipt.get("category_name") or "Ohne Kategorie"
             if selected != "Alle Kategorien" and category_name != selected:
                 continue
-            haystack = " ".join(
-                filter(
-                    None,
-                    [
-                        receipt.get("issuer_name"),
-                        receipt.get("issuer_city"),
-                        receipt.get("description"),
-                        category_name,
-                    ],
-                )
-            ).lower()
-            if term and term not in haystack:
+            if term and term not in receipt["_haystack"]:
                 continue
             filtered.append(receipt)
 
         render_cards()
 
-    def render_cards() -> None:
-        """Rendert das Kartengrid neu, damit die Filterergebnisse sichtbar werden."""
-        cards_container.clear()
+    def render_cards(count: int = CARDS_PAGE_SIZE) -> None:
+        """Zeigt die ersten ``count`` Filtertreffer im Kartengrid an.
+
+        Einmal gebaute Karten bleiben erhalten und werden bei Filterwechseln nur ein-
+        bzw. ausgeblendet; neu gebaut werden nur Karten, die noch nie sichtbar waren.
+        Der Rest folgt seitenweise über den Button "Weitere Belege laden".
+        """
+        nonlocal rendered_count, empty_card
+        rendered_count = 0
         update_header()
 
-        if not filtered:
+        wanted = {receipt["receipt_id"] for receipt in filtered[:count]}
+        for receipt_id in shown_ids - wanted:
+            card_by_id[receipt_id].set_visibility(False)
+        shown_ids.intersection_update(wanted)
+
+        if empty_card is None and not filtered:
             with cards_container:
                 empty_card = ui.card().classes(
                     "w-full bg-white/85 border border-dashed border-grey-3 rounded-2xl p-8 text-grey-6 items-center gap-2"
@@ -199,88 +207,108 @@ def receipts_page():
                     ui.label("Passe Suche oder Filter an.").classes(
                         "text-caption text-grey-5"
                     )
-            return
+        if empty_card is not None:
+            empty_card.set_visibility(not filtered)
+
+        append_cards(count)
+
+    def append_cards(count: int = CARDS_PAGE_SIZE) -> None:
+        """Blendet die nächsten ``count`` Treffer ein und baut fehlende Karten auf."""
+        nonlocal rendered_count
+        batch = filtered[rendered_count : rendered_count + count]
+        rendered_count += len(batch)
+        remaining = len(filtered) - rendered_count
+        more_button.set_text(f"Weitere Belege laden ({remaining} übrig)")
+        more_button.set_visibility(remaining > 0)
+
+        for receipt in batch:
+            receipt_id = receipt["receipt_id"]
+            shown_ids.add(receipt_id)
+            existing = card_by_id.get(receipt_id)
+            if existing is not None:
+                existing.set_visibility(True)
+            else:
+                card_by_id[receipt_id] = build_card(receipt)
+
+    def build_card(receipt: dict) -> ui.card:
+        """Baut die Karte zu einem Beleg im Grid auf."""
+        receipt_id = receipt.get("receipt_id")
+        title = (
+            receipt.get("issuer_name")
+            or receipt.get("description")
+            or f"Beleg #{receipt_id}"
+        )
+        city = receipt.get("issuer_city")
+        formatted_date = receipt["_display_date"]
+        amount_value = receipt["_display_amount"]
+        category_name = receipt.get("category_name") or "Ohne Kategorie"
+        category_classes = CATEGORY_BADGE_CLASSES.get(
+            category_name, DEFAULT_CATEGORY_BADGE_CLASSES
+        )
+        status_label, status_classes = _resolve_status(receipt.get("status_name"))
+        # Karten zeigen nur das Vorschaubild, das Original lädt erst der Detaildialog.
+        image_source = (
+            f"/api/receipts/{receipt_id}/thumb"
+            if receipt.get("has_image")
+            else PLACEHOLDER_IMAGE_URL
+        )
 
-        for receipt in filtered:
-            receipt_id = receipt.get("receipt_id")
-            title = (
-                receipt.get("issuer_name")
-                or receipt.get("description")
-                or f"Beleg #{receipt_id}"
-            )
-            city = receipt.get("issuer_city")
-            date_value = receipt.get("transaction_date") or receipt.get("upload_date")
-            formatted_date = _format_date(date_value)
-            amount_value = _format_amount(receipt.get("amount"), receipt.get("currency"))
-            category_name = receipt.get("category_name") or "Ohne Kategorie"
-            category_classes = CATEGORY_STYLE_MAP.get(
-                category_name, DEFAULT_CATEGORY_STYLE
+        with cards_container:
+            card = ui.card().classes(
+                "receipt-card w-full max-w-[320px] min-w-[260px] bg-white/85 backdrop-blur "
+                "border border-white/70 rounded-2xl overflow-hidden shadow-lg transition-all "
+                "cursor-pointer hover:-translate-y-1 hover:shadow-xl"
             )
-            status_key = (receipt.get("status_name") or "").lower()
-            status_style = STATUS_STYLE_MAP.get(status_key, DEFAULT_STATUS_STYLE)
-            image_source = (
-                f"/api/receipts/{receipt_id}/image"
-                if receipt.get("has_image")
-                else PLACEHOLDER_IMAGE_DATA_URL
+            # Karten entstehen in beliebiger Reihenfolge (je nach Filter), die
+            # Flexbox-Order hält trotzdem die Sortierung der Belegliste ein.
+            card.style(f"order: {receipt['_position']}")
+            card.on(
+                "click",
+                lambda e, rid=receipt_id: show_receipt_detail(rid),
             )
-
-            with cards_container:
-                card = ui.card().classes(
-                    "receipt-card w-full max-w-[320px] min-w-[260px] bg-white/85 backdrop-blur "
-                    "border border-white/70 rounded-2xl overflow-hidden shadow-lg transition-all "
-                    "cursor-pointer hover:-translate-y-1 hover:shadow-xl"
-                )
-                card.on(
-                    "click",
-                    lambda e, rid=receipt_id: show_receipt_detail(rid),
+            with card:
+                ui.image(image_source).classes("w-full h-40 object-cover").props(
+                    "fit=cover"
                 )
-                with card:
-                    ui.image(image_source).classes("w-full h-40 object-cover").props(
-                        "fit=cover"
-                    )
-                    with ui.column().classes("p-4 gap-3"):
-                        with ui.column().classes("gap-1"):
-                            ui.label(title).classes(
-                                "text-body1 font-semibold text-grey-9 truncate"
-                            )
-                            with ui.row().classes(
-                                "items-center gap-1 text-caption text-grey-6"
-                            ):
-                                ui.icon("event").classes("text-sm text-grey-5")
-                                ui.label(formatted_date)
-                            if city:
-                                with ui.row().classes(
-                                    "items-center gap-1 text-caption text-grey-5"
-                                ):
-                                    ui.icon("location_on").classes("text-sm")
-                                    ui.label(city)
-                        ui.label(amount_value).classes(
-                            "text-subtitle1 font-semibold text-grey-8"
+                with ui.column().classes("p-4 gap-3"):
+                    with ui.column().classes("gap-1"):
+                        ui.label(title).classes(
+                            "text-body1 font-semibold text-grey-9 truncate"
                         )
                         with ui.row().classes(
-                            "items-end justify-between gap-2 w-full"
+                            "items-center gap-1 text-caption text-grey-6"
                         ):
-                            with ui.row().classes("items-center gap-2"):
-                                ui.label(category_name).classes(
-                                    f"{CATEGORY_BADGE_BASE} {category_classes}"
-                                )
-                                ui.label(status_style["label"]).classes(
-                                    f"{STATUS_BADGE_BASE} {status_style['classes']}"
-                                )
-                            delete_icon = ui.icon("delete_outline").classes(
-                                "receipt-delete-icon text-grey-5 hover:text-red-500 cursor-pointer text-2xl transition-colors"
-                            )
-                            delete_icon.on(
-                                "click.stop",
-                                lambda e, rid=receipt_id: handle_delete_click(rid),
-                            )
-
+                            ui.icon("event").classes("text-sm text-grey-5")
+                            ui.label(formatted_date)
+                        if city:
+                            with ui.row().classes(
+                                "items-center gap-1 text-caption text-grey-5"
+                            ):
+                                ui.icon("location_on").classes("text-sm")
+                                ui.label(city)
+                    ui.label(amount_value).classes(
+                        "text-subtitle1 font-semibold text-grey-8"
+                    )
+                    with ui.row().classes(
+                        "items-end justify-between gap-2 w-full"
+                    ):
+                        with ui.row().classes("items-center gap-2"):
+                            ui.label(category_name).classes(category_classes)
+                            ui.label(status_label).classes(status_classes)
+                        delete_icon = ui.icon("delete_outline").classes(
+                            "receipt-delete-icon text-grey-5 hover:text-red-500 cursor-pointer text-2xl transition-colors"
+                        )
+                        delete_icon.on(
+                            "click.stop",
+                            lambda e, rid=receipt_id: handle_delete_click(rid),
+                        )
+        return card
 
     async def handle_delete_click(receipt_id: int) -> None:
         """Löscht den ausgewählten Beleg, aktualisiert die UI und zeigt Feedback an."""
         nonlocal receipts, filtered
         try:
-            await asyncio.to_thread(
+            await run_db(
                 delete_receipt,
                 receipt_id,
                 user_id=user.get("user_id"),
@@ -294,8 +322,13 @@ def receipts_page():
 
         receipts = [r for r in receipts if r.get("receipt_id") != receipt_id]
         filtered = [r for r in filtered if r.get("receipt_id") != receipt_id]
+        card = card_by_id.pop(receipt_id, None)
+        if card is not None:
+            cards_container.remove(card)
+        shown_ids.discard(receipt_id)
         ui.notify("Beleg wurde gelöscht.", color="positive")
-        render_cards()
+        # Bereits aufgeklappte Seiten bleiben sichtbar.
+        render_cards(max(rendered_count, CARDS_PAGE_SIZE))
 
 
     async def show_receipt_detail(receipt_id: int) -> None:
@@ -308,14 +341,14 @@ def receipts_page():
         )
         detail_info_label.set_text("Beleg wird geladen ...")
         detail_info_label.classes("text-caption text-primary")
-        detail_image.set_source(PLACEHOLDER_IMAGE_DATA_URL)
+        detail_image.set_source(PLACEHOLDER_IMAGE_URL)
         date_field.value = ""
         amount_field.value = ""
         merchant_field.value = ""
         category_field.value = ""
 
         try:
-            payload = await asyncio.to_thread(get_receipt_detail, receipt_id)
+            payload = await run_db(get_receipt_detail, receipt_id)
         except Exception as exc:
             detail_info_label.set_text(f"Fehler beim Laden: {exc}")
             detail_info_label.classes("text-caption text-red-600")
@@ -329,9 +362,12 @@ def receipts_page():
             or f"Beleg #{receipt_id}"
         )
         detail_caption.set_text(receipt_title)
+        # Das Bild lädt der Browser direkt über den Bild-Endpunkt (wie bei den Karten),
+        # statt es als Base64 in die Detail-Antwort einzubetten.
         detail_image.set_source(
-            _image_to_data_url(payload.get("receipt_image"))
-            or PLACEHOLDER_IMAGE_DATA_URL
+            f"/api/receipts/{receipt_id}/image"
+            if payload.get("has_image")
+            else PLACEHOLDER_IMAGE_URL
         )
 
         txn = payload.get("transaction") or {}
@@ -349,11 +385,9 @@ def receipts_page():
         category_field.value = txn.get("category_name") or "Ohne Kategorie"
 
         status_key = (payload.get("status_name") or "").lower()
-        status_style = STATUS_STYLE_MAP.get(status_key, DEFAULT_STATUS_STYLE)
-        detail_status_badge.set_text(status_style["label"])
-        detail_status_badge.classes(
-            f"{STATUS_BADGE_BASE} {status_style['classes']}"
-        )
+        status_label, status_classes = _resolve_status(status_key)
+        detail_status_badge.set_text(status_label)
+        detail_status_badge.classes(status_classes)
 
         if payload.get("error_message"):
             detail_info_label.set_text(payload["error_message"])
@@ -367,10 +401,10 @@ def receipts_page():
 
     async def load_data() -> None:
         """Lädt alle Belege vom Backend und setzt Filter sowie UI-Elemente zurück."""
-        nonlocal receipts, filtered, category_options
+        nonlocal receipts, filtered, category_options, empty_card
         try:
             user_id = user.get("user_id") or None
-            data = await asyncio.to_thread(
+            data = await run_db(
                 list_receipts_overview, user_id
             )
         except Exception as exc:
@@ -389,6 +423,31 @@ def receipts_page():
             return
 
         receipts = data
+        cards_container.clear()
+        card_by_id.clear()
+        shown_ids.clear()
+        empty_card = None
+        # Suchtext und Anzeigewerte pro Beleg einmal beim Laden bauen statt bei jedem
+        # Tastendruck bzw. jedem Neuaufbau der Karten.
+        for position, receipt in enumerate(receipts):
+            receipt["_position"] = position
+            receipt["_display_date"] = _format_date(
+                receipt.get("transaction_date") or receipt.get("upload_date")
+            )
+            receipt["_display_amount"] = _format_amount(
+                receipt.get("amount"), receipt.get("currency")
+            )
+            receipt["_haystack"] = " ".join(
+                filter(
+                    None,
+                    [
+                        receipt.get("issuer_name"),
+                        receipt.get("issuer_city"),
+                        receipt.get("description"),
+                        receipt.get("category_name") or "Ohne Kategorie",
+                    ],
+                )
+            ).lower()
         filtered = receipts.copy()
         categories = sorted(
             {r.get("category_name") or "Ohne Kategorie" for r in receipts}
@@ -401,6 +460,8 @@ def receipts_page():
         loading_container.clear()
         apply_filters()
 
+    # Quasar meldet den Suchtext erst 150 ms nach dem letzten Tastendruck (debounce),
+    # die Karten werden also einmal pro Eingabe statt pro Zeichen neu aufgebaut.
     search_input.on("update:model-value", lambda e: apply_filters())
     category_select.on("update:model-value", lambda e: apply_filters())
     ui.timer(0.1, load_data, once=True)
@@ -2,11 +2,9 @@
 
 from __future__ import annotations
 
-import asyncio
-
 from nicegui import ui
 
-from app.db import get_user_settings, save_user_settings
+from app.db import get_user_settings, run_db, save_user_settings
 from app.helpers.auth_helpers import _ensure_authenticated, _get_user_store
 from app.ui_layout import nav
 
@@ -83,7 +81,7 @@ def settings_page():
                     user_id = user.get('user_id')
                     if user_id:
                         try:
-                            await asyncio.to_thread(
+                            await run_db(
                                 save_user_settings,
                                 user_id,
                                 max_budget=budget_amount,
@@ -2,15 +2,12 @@
 
 from __future__ import annotations
 
-import asyncio
-
 from nicegui import ui
 
 from app.helpers.auth_helpers import _ensure_authenticated
 from app.helpers.ui_helpers import notify_error, notify_success
 from app.ui_layout import nav
-from app.receipt_analysis import analyze_receipt
-from app.services.receipt_upload_service import process_receipt_upload
+from app.services.receipt_upload_service import MAX_UPLOAD_BYTES, upload_and_analyze_receipt
 from app.ui_theme import UPLOAD_CARD
 
 
@@ -54,21 +51,22 @@ def upload_page():
             safe_name = file_name or 'receipt.bin'
             try:
                 status_label.set_text('Beleg wird hochgeladen und gespeichert …')
-                upload_result = await asyncio.to_thread(
-                    process_receipt_upload,
+                await upload_and_analyze_receipt(
                     user_id,
                     file_content,
                     safe_name,
+                    on_stored=lambda _: status_label.set_text('Analyse wird durchgeführt …'),
                 )
-                status_label.set_text('Analyse wird durchgeführt …')
-                analysis = await analyze_receipt(upload_result['receipt_id'], user_id)
-                upload_result['analysis'] = analysis
                 status_label.set_text('Upload & Analyse erfolgreich.')
                 notify_success('Beleg verarbeitet')
             except Exception as error:
                 status_label.set_text(f'Fehler: {error!s}')
                 notify_error(str(error))
 
+        def handle_rejected() -> None:
+            """Meldet Dateien, die der Browser wegen der Grösse gar nicht erst hochlädt."""
+            notify_error('Die Datei ist zu groß (maximal 50 MB).')
+
         async def handle_upload(event) -> None:
             """Liest die NiceGUI-Upload-Daten aus und startet die asynchrone Verarbeitung."""
             file_bytes = await event.file.read()
@@ -81,7 +79,7 @@ def upload_page():
                     ui.icon('photo_camera').classes('text-white bg-gradient-to-br from-blue-500 to-blue-700 rounded-[20px] q-pa-lg').style('font-size: 32px')
                     ui.label('Foto aufnehmen').classes('text-subtitle2 text-grey-9')
                     ui.label('Kamera verwenden um Beleg zu fotografieren').classes('text-caption text-grey-6')
-                    cam_u = ui.upload(auto_upload=True, multiple=False)
+                    cam_u = ui.upload(auto_upload=True, multiple=False, max_file_size=MAX_UPLOAD_BYTES, on_rejected=handle_rejected)
                     cam_u.props('accept="image/*" capture=environment style="display:none"')
                     def open_camera_picker() -> None:
                         cam_u.run_method('pickFiles')
@@ -93,7 +91,7 @@ def upload_page():
                     ui.icon('description').classes('text-white bg-gradient-to-br from-blue-500 to-blue-700 rounded-[20px] q-pa-lg').style('font-size: 32px')
                     ui.label('Datei auswählen').classes('text-subtitle2 text-grey-9')
                     ui.label('PDF oder Bild von Ihrem Gerät auswählen').classes('text-caption text-grey-6')
-                    file_u = ui.upload(auto_upload=True, multiple=False)
+                    file_u = ui.upload(auto_upload=True, multiple=False, max_file_size=MAX_UPLOAD_BYTES, on_rejected=handle_rejected)
                     file_u.props('accept=".pdf,.heic,.heif,.jpg,.jpeg,.png,.webp,image/*" style="display:none"')
                     def open_file_picker() -> None:
                         file_u.run_method('pickFiles')
@@ -110,7 +108,7 @@ def upload_page():
                     ui.icon('upload').classes('text-white bg-gradient-to-br from-blue-500 to-blue-700 rounded-[20px] q-pa-lg').style('font-size: 32px')
                     ui.label('Drag and Drop').classes('text-subtitle2 text-grey-9')
                     ui.label('Beleg hierher ziehen und ablegen').classes('text-caption text-grey-6')
-                drop_u = ui.upload(label='', auto_upload=True, multiple=False)
+                drop_u = ui.upload(label='', auto_upload=True, multiple=False, max_file_size=MAX_UPLOAD_BYTES, on_rejected=handle_rejected)
                 drop_u.props('accept=".pdf,.heic,.heif,.jpg,.jpeg,.png,.webp,image/*" style="opacity:0; position:absolute; inset:0; cursor:pointer"')
                 drop_u.on_upload(handle_upload)
 
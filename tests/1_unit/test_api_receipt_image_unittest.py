@@ -0,0 +1,129 @@
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app import db
+from app.main import app
+
+# PNG-Signatur gefolgt von Füllbytes; grösser als ein Block (256 KB), damit
+# ungecacht mehrere Blöcke gestreamt werden
+_IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 1100
+
+
+class _FakeCursor:
+    """Beantwortet die Kopf- und Block-Abfragen aus `app.db` mit `_IMAGE`."""
+
+    def __init__(self) -> None:
+        self._row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def execute(self, sql: str, params: tuple) -> None:
+        statement, _types, *values = params
+        receipt_id = values[-1]
+        if receipt_id != 1:
+            self._row = None
+        elif "DATALENGTH" in statement:
+            signature_length, offset, length, _ = values
+            self._row = {
+                "receipt_id": 1,
+                "user_id": 7,
+                "size": len(_IMAGE),
+                "signature": _IMAGE[:signature_length],
+                "chunk": _IMAGE[offset - 1 : offset - 1 + length],
+            }
+        else:
+            offset, length, _ = values
+            self._row = {"chunk": _IMAGE[offset - 1 : offset - 1 + length]}
+
+    def fetchone(self):
+        return self._row
+
+
+class _FakeConnection:
+    def cursor(self, as_dict: bool = False) -> _FakeCursor:
+        return _FakeCursor()
+
+
+@contextmanager
+def _fake_get_connection(**_kwargs):
+    yield _FakeConnection()
+
+
+# ## Tests fuer GET /api/receipts/{id}/image
+# - Prüft Status, Content-Type und Content-Range mit und ohne Bild-Cache.
+class ApiReceiptImageTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = TestClient(app)
+        db._receipt_image_cache.invalidate(1)
+        self.addCleanup(db._receipt_image_cache.invalidate, 1)
+        patcher = patch.object(db, "_get_connection", _fake_get_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get(self, range_header: str | None = None, *, cached: bool):
+        if cached:
+            db._receipt_image_cache.set(1, 7, _IMAGE)
+        else:
+            db._receipt_image_cache.invalidate(1)
+        headers = {"Range": range_header} if range_header else {}
+        return self.client.get("/api/receipts/1/image", headers=headers)
+
+    def test_full_image_has_same_headers_with_and_without_cache(self):
+        for cached in (False, True):
+            with self.subTest(cached=cached):
+                response = self._get(cached=cached)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.headers["content-type"], "image/png")
+                self.assertEqual(response.headers["content-length"], str(len(_IMAGE)))
+                self.assertNotIn("content-range", response.headers)
+                self.assertEqual(response.content, _IMAGE)
+
+    def test_range_inside_image_keeps_media_type(self):
+        # **Gegeben:** ein Bereich, der mitten im Bild (nach der Signatur) beginnt
+        start, end = 5000, 270000
+        for cached in (False, True):
+            with self.subTest(cached=cached):
+                # **Wenn:** der Bereich mit und ohne Cache abgefragt wird
+                response = self._get(f"bytes={start}-{end}", cached=cached)
+                # **Dann:** gleiche Antwort, der Typ kommt weiterhin aus dem Dateikopf
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response.headers["content-type"], "image/png")
+                self.assertEqual(
+                    response.headers["content-range"], f"bytes {start}-{end}/{len(_IMAGE)}"
+                )
+                self.assertEqual(response.content, _IMAGE[start : end + 1])
+
+    def test_open_range_runs_to_end_of_image(self):
+        for cached in (False, True):
+            with self.subTest(cached=cached):
+                response = self._get("bytes=100-", cached=cached)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response.headers["content-type"], "image/png")
+                self.assertEqual(
+                    response.headers["content-range"],
+                    f"bytes 100-{len(_IMAGE) - 1}/{len(_IMAGE)}",
+                )
+                self.assertEqual(response.content, _IMAGE[100:])
+
+    def test_range_after_end_is_not_satisfiable(self):
+        for cached in (False, True):
+            with self.subTest(cached=cached):
+                response = self._get(f"bytes={len(_IMAGE)}-", cached=cached)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response.headers["content-range"], f"bytes */{len(_IMAGE)}")
+                self.assertNotIn("content-type", response.headers)
+
+    def test_unknown_receipt_returns_404(self):
+        response = self.client.get("/api/receipts/2/image")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
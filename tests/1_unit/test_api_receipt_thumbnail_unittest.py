@@ -0,0 +1,82 @@
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.services.receipt_thumbnail_service as thumbnail_service
+from app import db
+from app.main import app
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+# ## Tests fuer GET /api/receipts/{id}/thumb
+# - Prüft Vorschaubild, 304 bei bekanntem ETag und die Weiterleitung auf das Original.
+class ApiReceiptThumbnailTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = TestClient(app)
+        self.images = {1: _jpeg(1600, 1200), 2: b"%PDF-1.7 kein Bild"}
+        self.load_calls: list[dict] = []
+        patcher = patch.object(
+            thumbnail_service, "load_receipt_image", side_effect=self._load_receipt_image
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for receipt_id in (1, 2):
+            db._receipt_thumbnail_cache.invalidate(receipt_id)
+            self.addCleanup(db._receipt_thumbnail_cache.invalidate, receipt_id)
+
+    def _load_receipt_image(self, receipt_id: int, **kwargs) -> dict:
+        self.load_calls.append(kwargs)
+        if receipt_id not in self.images:
+            raise ValueError(f"Beleg mit der ID {receipt_id} nicht gefunden.")
+        return {"receipt_id": receipt_id, "user_id": 7, "receipt_image": self.images[receipt_id]}
+
+    def test_thumbnail_is_rendered_once_and_cached(self):
+        # **Wenn:** das Vorschaubild zweimal abgefragt wird
+        first = self.client.get("/api/receipts/1/thumb")
+        second = self.client.get("/api/receipts/1/thumb")
+        # **Dann:** ein verkleinertes JPEG, das Original wird nur einmal geladen
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["content-type"], "image/jpeg")
+        self.assertEqual(first.headers["etag"], '"receipt-thumb-1"')
+        with Image.open(BytesIO(first.content)) as img:
+            self.assertEqual(img.size, (320, 240))
+        self.assertEqual(second.content, first.content)
+        # Das Original soll die Bilder im Bild-Cache nicht verdrängen
+        self.assertEqual(self.load_calls, [{"populate_cache": False}])
+
+    def test_known_etag_returns_304_without_loading(self):
+        response = self.client.get(
+            "/api/receipts/1/thumb", headers={"If-None-Match": '"receipt-thumb-1"'}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.load_calls, [])
+
+    def test_undecodable_image_redirects_to_original(self):
+        # **Gegeben:** ein Beleg, der als PDF gespeichert ist
+        # **Wenn:** das Vorschaubild abgefragt wird
+        response = self.client.get("/api/receipts/2/thumb", follow_redirects=False)
+        # **Dann:** Weiterleitung auf den Original-Endpunkt
+        self.assertEqual(response.status_code, 307)
+        self.assertEqual(response.headers["location"], "/api/receipts/2/image")
+
+    def test_decompression_bomb_redirects_to_original(self):
+        with patch.object(Image, "MAX_IMAGE_PIXELS", 1000):
+            response = self.client.get("/api/receipts/1/thumb", follow_redirects=False)
+        self.assertEqual(response.status_code, 307)
+        self.assertEqual(response.headers["location"], "/api/receipts/1/image")
+
+    def test_unknown_receipt_returns_404(self):
+        response = self.client.get("/api/receipts/3/thumb")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
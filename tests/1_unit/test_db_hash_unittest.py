@@ -1,5 +1,5 @@
 import unittest
-from app.db import _hash_password
+from app.db import _hash_password, _hash_password_scrypt, _verify_password
 
 
 class HashPasswordTests(unittest.TestCase):
@@ -42,5 +42,22 @@ class HashPasswordTests(unittest.TestCase):
                     _hash_password(f"pass{sample}word", "0123456789abcdef0123456789abcdef")
 
 
+class VerifyPasswordTests(unittest.TestCase):
+    salt = "0123456789abcdef0123456789abcdef"
+
+    def test_scrypt_hash_has_prefix_and_verifies(self):
+        stored = _hash_password_scrypt("secret123", self.salt)
+
+        self.assertTrue(stored.startswith("scrypt$"))
+        self.assertTrue(_verify_password("secret123", self.salt, stored))
+        self.assertFalse(_verify_password("secret124", self.salt, stored))
+
+    def test_legacy_pbkdf2_hash_still_verifies(self):
+        stored = _hash_password("secret123", self.salt)
+
+        self.assertTrue(_verify_password("secret123", self.salt, stored))
+        self.assertFalse(_verify_password("wrong", self.salt, stored))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from app import db
+
+
+# ## Tests fuer app.db._ReceiptImageCache
+# - Prüft Byte-Budget, LRU-Verdrängung und Invalidierung.
+class ReceiptImageCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        # Budget 80 Bytes -> Einzelbilder bis 10 Bytes werden aufgenommen
+        self.cache = db._ReceiptImageCache(max_bytes=80)
+
+    def test_hit_returns_owner_and_image(self):
+        self.cache.set(1, 7, b"abc")
+        self.assertEqual(self.cache.get(1), (7, b"abc"))
+        self.assertIsNone(self.cache.get(2))
+
+    def test_least_recently_used_is_evicted_when_budget_exceeded(self):
+        # **Gegeben:** acht Bilder zu je 10 Bytes füllen das Budget
+        for receipt_id in range(8):
+            self.cache.set(receipt_id, 1, bytes(10))
+        # **Wenn:** Bild 0 gelesen und ein weiteres Bild abgelegt wird
+        self.cache.get(0)
+        self.cache.set(8, 1, bytes(10))
+        # **Dann:** das am längsten ungenutzte Bild (1) fliegt raus, 0 bleibt
+        self.assertIsNotNone(self.cache.get(0))
+        self.assertIsNone(self.cache.get(1))
+        self.assertIsNotNone(self.cache.get(8))
+
+    def test_large_images_are_not_cached(self):
+        self.cache.set(1, 1, bytes(11))
+        self.assertIsNone(self.cache.get(1))
+
+    def test_buffers_are_stored_as_immutable_bytes(self):
+        # **Gegeben/Wenn:** ein Bild wird als veränderbarer Puffer abgelegt
+        buffer = bytearray(b"abc")
+        self.cache.set(1, 1, buffer)
+        buffer[0] = ord("x")
+        # **Dann:** der Cache liefert eine unveränderliche, unberührte Kopie
+        _, image = self.cache.get(1)
+        self.assertIs(type(image), bytes)
+        self.assertEqual(image, b"abc")
+
+    def test_invalidate_removes_entry(self):
+        self.cache.set(1, 1, b"abc")
+        self.cache.invalidate(1)
+        self.assertIsNone(self.cache.get(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+
+import pymssql
+
+from app import db
+
+
+class _FakeConnection:
+    """Minimaler Ersatz für eine pymssql-Verbindung (ohne Netzwerk)."""
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.rollbacks = 0
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+# ## Tests fuer app.db._ConnectionPool
+# - Prüft Wiederverwendung, Verwerfen defekter Verbindungen und Rollback.
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.created: list[_FakeConnection] = []
+        self.pool = db._ConnectionPool({}, min_size=1, max_size=2)
+        patcher = patch.object(self.pool, "_connect", side_effect=self._make_conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_conn(self) -> _FakeConnection:
+        conn = _FakeConnection()
+        self.created.append(conn)
+        return conn
+
+    def test_connection_is_reused(self):
+        # **Gegeben/Wenn:** zwei aufeinanderfolgende Ausleihen
+        with self.pool.acquire() as first:
+            pass
+        with self.pool.acquire() as second:
+            pass
+        # **Dann:** nur eine echte Verbindung wurde geöffnet
+        self.assertIs(first, second)
+        self.assertEqual(len(self.created), 1)
+
+    def test_database_error_discards_connection(self):
+        # **Gegeben/Wenn:** ein Datenbankfehler während der Nutzung
+        with self.assertRaises(pymssql.OperationalError):
+            with self.pool.acquire() as conn:
+                raise pymssql.OperationalError("connection lost")
+        # **Dann:** die Verbindung wird geschlossen und nicht wiederverwendet
+        self.assertTrue(conn.closed)
+        with self.pool.acquire() as fresh:
+            self.assertIsNot(fresh, conn)
+
+    def test_other_error_rolls_back_and_keeps_connection(self):
+        # **Gegeben/Wenn:** ein fachlicher Fehler (ValueError) im with-Block
+        with self.assertRaises(ValueError):
+            with self.pool.acquire() as conn:
+                raise ValueError("Beleg nicht gefunden")
+        # **Dann:** offene Änderungen werden verworfen, die Verbindung bleibt nutzbar
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertFalse(conn.closed)
+        with self.pool.acquire() as again:
+            self.assertIs(again, conn)
+
+    def test_acquire_times_out_when_pool_is_exhausted(self):
+        # **Gegeben:** ein Pool mit einer Verbindung, die gerade ausgeliehen ist
+        pool = db._ConnectionPool({}, min_size=0, max_size=1, acquire_timeout=0.01)
+        with patch.object(pool, "_connect", side_effect=self._make_conn):
+            with pool.acquire():
+                # **Wenn/Dann:** eine zweite Ausleihe bricht mit klarer Meldung ab
+                with self.assertRaisesRegex(RuntimeError, "Keine freie Datenbankverbindung"):
+                    with pool.acquire():
+                        pass
+            # Danach ist der Platz wieder frei
+            with pool.acquire():
+                pass
+
+    def test_close_all_closes_idle_connections(self):
+        with self.pool.acquire() as conn:
+            pass
+        self.pool.close_all()
+        self.assertTrue(conn.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
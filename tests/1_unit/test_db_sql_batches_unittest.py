@@ -0,0 +1,245 @@
+import unittest
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import patch
+
+import pymssql
+
+from app import db
+
+
+class _FakeCursor:
+    """Zeichnet ausgeführte Statements auf und liefert vorbereitete Ergebnisse."""
+
+    def __init__(self, connection: "_FakeConnection") -> None:
+        self._connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def execute(self, sql: str, params: tuple = ()) -> None:
+        self._connection.executed.append((sql, tuple(params)))
+        if self._connection.error is not None:
+            raise self._connection.error
+
+    def fetchone(self):
+        return self._connection.results.pop(0) if self._connection.results else None
+
+    def fetchall(self):
+        return self._connection.results.pop(0) if self._connection.results else []
+
+
+class _FakeConnection:
+    """Ersatz für eine Pool-Verbindung (ohne Netzwerk)."""
+
+    def __init__(self) -> None:
+        self.executed: list[tuple[str, tuple]] = []
+        self.results: list = []
+        self.error: Exception | None = None
+        self.commits = 0
+
+    def cursor(self, as_dict: bool = False) -> _FakeCursor:
+        return _FakeCursor(self)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+
+class _SqlBatchTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = _FakeConnection()
+
+        @contextmanager
+        def fake_get_connection(**_kwargs):
+            yield self.conn
+
+        patcher = patch.object(db, "_get_connection", fake_get_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        db._primary_account_cache.invalidate()
+        self.addCleanup(db._primary_account_cache.invalidate)
+
+    def assert_placeholders_match(self, sql: str, params: tuple) -> None:
+        """Jeder %s-Platzhalter im Batch bekommt genau einen Parameter."""
+        self.assertEqual(sql.count("%s"), len(params))
+
+
+def _transaction_row(index: int) -> dict:
+    return {
+        "account_id": 1,
+        "amount": index,
+        "category_id": None,
+        "description": f"Zeile {index}",
+        "txn_date": "2024-01-01",
+        "txn_type": "expense",
+    }
+
+
+# ## Tests fuer app.db.insert_transaction_records
+# - Prüft MERGE-Batch, Aufteilung in Blöcke und Zuordnung der neuen IDs.
+class InsertTransactionRecordsTests(_SqlBatchTestCase):
+    def _answer_with_ids(self, *batch_sizes: int) -> None:
+        # Der Server liefert die OUTPUT-Zeilen in beliebiger Reihenfolge (hier umgekehrt)
+        offset = 0
+        for size in batch_sizes:
+            self.conn.results.append(
+                [
+                    {
+                        "row_index": index,
+                        "transaction_id": 1000 + index,
+                        "created_at": datetime(2024, 1, 1),
+                    }
+                    for index in reversed(range(offset, offset + size))
+                ]
+            )
+            offset += size
+
+    def test_rows_are_split_into_batches_of_200(self):
+        # **Gegeben:** 450 Transaktionen
+        rows = [_transaction_row(i) for i in range(450)]
+        self._answer_with_ids(200, 200, 50)
+        # **Wenn:** sie gespeichert werden
+        results = db.insert_transaction_records(rows)
+        # **Dann:** drei Batches (200/200/50), 9 Parameter pro Zeile, ein Commit
+        self.assertEqual(len(self.conn.executed), 3)
+        for (sql, params), size in zip(self.conn.executed, (200, 200, 50)):
+            self.assertEqual(len(params), 9 * size)
+            self.assert_placeholders_match(sql, params)
+        self.assertEqual(self.conn.commits, 1)
+        # Zeilenindex (erster Parameter jeder Zeile) zählt über die Batches weiter
+        second_batch = self.conn.executed[1][1]
+        self.assertEqual(second_batch[0], 200)
+        self.assertEqual(second_batch[9], 201)
+        # Die IDs gehören trotz umgekehrter OUTPUT-Reihenfolge zur richtigen Zeile
+        self.assertEqual(
+            [result["transaction_id"] for result in results],
+            [1000 + i for i in range(450)],
+        )
+        self.assertEqual(results[0]["created_at"], "2024-01-01T00:00:00")
+
+    def test_batch_is_merge_with_output_of_source_row_index(self):
+        self._answer_with_ids(1)
+        db.insert_transaction_records([_transaction_row(0)])
+        sql, params = self.conn.executed[0]
+        self.assertIn("MERGE INTO app.transactions", sql)
+        self.assertIn("ON 1 = 0", sql)
+        self.assertIn("OUTPUT source.row_index, INSERTED.transaction_id", sql)
+        self.assertIn("INTO @inserted", sql)
+        self.assertIn("SELECT row_index, transaction_id, created_at FROM @inserted", sql)
+        # Ohne Angabe wird in CHF gebucht
+        self.assertEqual(params[-1], "CHF")
+
+    def test_missing_output_row_raises_without_commit(self):
+        self.conn.results.append([])
+        with self.assertRaises(RuntimeError):
+            db.insert_transaction_records([_transaction_row(0)])
+        self.assertEqual(self.conn.commits, 0)
+
+    def test_empty_input_sends_nothing(self):
+        self.assertEqual(db.insert_transaction_records([]), [])
+        self.assertEqual(self.conn.executed, [])
+
+
+# ## Tests fuer app.db.get_primary_account_id
+# - Prüft den Batch aus Suche und Neuanlage sowie den Cache.
+class GetPrimaryAccountIdTests(_SqlBatchTestCase):
+    def test_lookup_and_create_run_in_one_locked_batch(self):
+        # **Gegeben/Wenn:** der Server liefert das (ggf. neu angelegte) Konto 42
+        self.conn.results.append({"account_id": 42})
+        account_id = db.get_primary_account_id(7)
+        # **Dann:** ein einziger Batch mit Sperre, Neuanlage und Commit
+        self.assertEqual(account_id, 42)
+        self.assertEqual(len(self.conn.executed), 1)
+        sql, params = self.conn.executed[0]
+        self.assertIn("WITH (UPDLOCK, HOLDLOCK)", sql)
+        self.assertIn("IF @account_id IS NULL", sql)
+        self.assertIn("SCOPE_IDENTITY()", sql)
+        self.assert_placeholders_match(sql, params)
+        self.assertEqual(params[:2], (7, 7))
+        self.assertEqual(self.conn.commits, 1)
+
+    def test_result_is_cached(self):
+        self.conn.results.append({"account_id": 42})
+        db.get_primary_account_id(7)
+        self.assertEqual(db.get_primary_account_id(7), 42)
+        self.assertEqual(len(self.conn.executed), 1)
+
+    def test_missing_account_raises(self):
+        self.conn.results.append({"account_id": None})
+        with self.assertRaises(RuntimeError):
+            db.get_primary_account_id(7)
+
+
+# ## Tests fuer app.db.create_user
+# - Prüft Dublettenprüfung und Anlage in einem Batch.
+class CreateUserTests(_SqlBatchTestCase):
+    def test_user_and_credentials_are_created_in_one_batch(self):
+        self.conn.results.append(
+            {
+                "email_taken": False,
+                "user_id": 5,
+                "name": "Anna",
+                "email": "anna@example.com",
+                "creation_date": datetime(2024, 1, 1),
+            }
+        )
+        user = db.create_user(" Anna ", " Anna@Example.com ", "geheim")
+        self.assertEqual(user["user_id"], 5)
+        self.assertEqual(len(self.conn.executed), 1)
+        sql, params = self.conn.executed[0]
+        self.assertIn("WITH (UPDLOCK, HOLDLOCK)", sql)
+        self.assertIn("RETURN;", sql)
+        self.assertIn("INTO @new_user", sql)
+        self.assertIn("INSERT INTO app.user_credentials", sql)
+        self.assert_placeholders_match(sql, params)
+        # E-Mail wird bereinigt und klein geschrieben verglichen und gespeichert
+        self.assertEqual(params[:3], ("anna@example.com", "Anna", "anna@example.com"))
+        self.assertTrue(params[3].startswith("scrypt$"))
+        self.assertEqual(self.conn.commits, 1)
+
+    def test_taken_email_raises_value_error(self):
+        # **Gegeben:** der Batch meldet eine bereits vergebene E-Mail
+        self.conn.results.append({"email_taken": True})
+        # **Wenn/Dann:** ValueError, nichts wird committet
+        with self.assertRaisesRegex(ValueError, "existiert bereits"):
+            db.create_user("Anna", "anna@example.com", "geheim")
+        self.assertEqual(self.conn.commits, 0)
+
+
+# ## Tests fuer app.db.delete_receipt und app.db.insert_receipt
+# - Prüft Besitzprüfung im DELETE und die Übersetzung von Fehler 547.
+class ReceiptWriteTests(_SqlBatchTestCase):
+    def test_delete_checks_owner_in_the_same_statement(self):
+        self.conn.results.append((3,))
+        db.delete_receipt(3, user_id=7)
+        # delete_receipt läuft über sp_executesql: Statement und Typen sind Parameter
+        sql, (statement, param_types, *values) = self.conn.executed[0]
+        self.assertTrue(sql.startswith("EXEC sp_executesql"))
+        self.assertIn("OUTPUT DELETED.receipt_id", statement)
+        self.assertIn("AND user_id=@user_id", statement)
+        self.assertEqual(param_types, "@receipt_id INT, @user_id INT")
+        self.assertEqual(values, [3, 7])
+
+    def test_delete_of_foreign_or_missing_receipt_raises(self):
+        with self.assertRaises(ValueError):
+            db.delete_receipt(3, user_id=7)
+
+    def test_foreign_key_error_547_means_unknown_user(self):
+        # **Gegeben:** der Fremdschlüssel auf app.users schlägt fehl (Fehler 547)
+        self.conn.error = pymssql.IntegrityError(547, b"FK_receipts_users")
+        # **Wenn/Dann:** die Datenbankschicht meldet einen fachlichen ValueError
+        with self.assertRaisesRegex(ValueError, "Benutzer mit der ID 9"):
+            db.insert_receipt(9, b"\xff\xd8\xff bild")
+        self.assertEqual(self.conn.commits, 0)
+
+    def test_other_integrity_errors_are_not_translated(self):
+        self.conn.error = pymssql.IntegrityError(2627, b"duplicate key")
+        with self.assertRaises(pymssql.IntegrityError):
+            db.insert_receipt(9, b"\xff\xd8\xff bild")
+
+
+if __name__ == "__main__":
+    unittest.main()
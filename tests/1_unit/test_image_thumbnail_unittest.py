@@ -0,0 +1,53 @@
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from app.helpers.image_helpers import make_thumbnail
+
+
+def _jpeg_with_orientation(width: int, height: int, orientation: int) -> bytes:
+    """Erzeugt ein JPEG, dessen EXIF-Orientation-Tag (0x0112) gesetzt ist."""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+# ## Tests fuer app.helpers.image_helpers.make_thumbnail
+# - Prüft Größe und EXIF-Drehung der Vorschaubilder.
+class MakeThumbnailTests(unittest.TestCase):
+    def test_landscape_image_fits_thumbnail_box(self):
+        thumb = make_thumbnail(_jpeg_with_orientation(1600, 1200, 1))
+        with Image.open(BytesIO(thumb)) as img:
+            self.assertEqual(img.format, "JPEG")
+            self.assertEqual(img.size, (320, 240))
+
+    def test_exif_orientation_is_applied(self):
+        # **Gegeben:** ein quer gespeichertes Foto mit Orientation 6 (90° im Uhrzeigersinn)
+        data = _jpeg_with_orientation(1600, 1200, 6)
+        # **Wenn:** das Vorschaubild erzeugt wird
+        thumb = make_thumbnail(data)
+        # **Dann:** ist es hochkant, so wie das Foto angezeigt wird
+        with Image.open(BytesIO(thumb)) as img:
+            width, height = img.size
+        self.assertLess(width, height)
+        self.assertEqual(height, 240)
+
+    def test_non_image_raises_oserror(self):
+        with self.assertRaises(OSError):
+            make_thumbnail(b"%PDF-1.7 kein Bild")
+
+    def test_decompression_bomb_raises_oserror(self):
+        # **Gegeben:** ein Bild über Pillows Pixel-Grenze (hier künstlich klein gesetzt)
+        data = _jpeg_with_orientation(320, 240, 1)
+        with patch.object(Image, "MAX_IMAGE_PIXELS", 1000):
+            # **Wenn/Dann:** der Fehler kommt wie bei anderen unlesbaren Daten als OSError
+            with self.assertRaises(OSError):
+                make_thumbnail(data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -52,7 +52,7 @@ class ApiUploadIntegrationTest(unittest.TestCase):
         ), patch.object(
             upload_service, "insert_receipt", side_effect=fake_insert_receipt
         ), patch.object(
-            main, "analyze_receipt", side_effect=fake_analyze
+            upload_service, "analyze_receipt", side_effect=fake_analyze
         ):
             resp = self.client.post(
                 "/api/upload",